@@ -3,7 +3,27 @@ import json
 import time
 import html
 import asyncio
-from datetime import datetime
+
+# orjson (C-расширение) декодирует JSON в ~3-5 раз быстрее stdlib — заметно
+# на result_news.json в несколько сотен КБ. При отсутствии пакета молча
+# откатываемся на stdlib json, поведение идентично.
+try:
+    import orjson
+
+    def _json_loads(data):
+        return orjson.loads(data)
+
+    def _json_dumps_bytes(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    orjson = None
+
+    def _json_loads(data):
+        return json.loads(data)
+
+    def _json_dumps_bytes(obj):
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 from dotenv import load_dotenv
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
@@ -12,6 +32,7 @@ from bot.published_news_tracker import check_duplicate, add_published_news
 from bot.categories import category_emoji, category_label, CATEGORY_ORDER
 from bot.digest_buffer import add_to_digest, load_pending, clear_pending, pending_count
 from bot.paths import DATA_DIR
+from bot.rate_limiter import acquire_send_slot
 
 # Загрузка ключей
 load_dotenv()
@@ -19,8 +40,9 @@ BOT_TOKEN = os.getenv("TELEGRAM_TOKEN")
 CHANNEL_ID = os.getenv("TELEGRAM_CHANNEL_ID")
 ADMIN_CHAT_ID = os.getenv("ADMIN_CHAT_ID")  # Нужно добавить в .env ваш chat_id
 
-# Список разрешенных пользователей (Telegram ID)
-ALLOWED_USERS = [int(x) for x in os.getenv("ALLOWED_USERS", ADMIN_CHAT_ID or "").split(",") if x.strip()]
+# Список разрешенных пользователей (Telegram ID).
+# frozenset — проверка доступа в начале каждого хэндлера становится O(1)
+ALLOWED_USERS = frozenset(int(x) for x in os.getenv("ALLOWED_USERS", ADMIN_CHAT_ID or "").split(",") if x.strip())
 
 # Константы Telegram
 MAX_MESSAGE_LENGTH = 4096
@@ -43,6 +65,11 @@ DIGEST_HOURS = os.getenv("DIGEST_HOURS", "9,15,21")
 QUIET_START = int(os.getenv("QUIET_START", "0"))
 QUIET_END = int(os.getenv("QUIET_END", "8"))
 
+# Размер пачки в ручной модерации: 1 (по умолчанию) — классический режим
+# «одна карточка — одно сообщение»; больше — новости идут пачками по K штук
+# в одном сообщении с рядом кнопок на каждую (меньше round-trip'ов на сессию)
+REVIEW_BATCH_SIZE = int(os.getenv("REVIEW_BATCH_SIZE", "1"))
+
 
 def in_quiet_hours(now=None):
     """True, если сейчас тихие часы (интервал может пересекать полночь)."""
@@ -58,134 +85,200 @@ RESULT_NEWS_FILE = DATA_DIR / "result_news.json"
 REJECTED_NEWS_FILE = DATA_DIR / "rejected_news.json"
 SETTINGS_FILE = DATA_DIR / "settings.json"
 
+# Кэш распарсенных JSON-файлов: path -> (st_mtime_ns, данные).
+# load_news/load_settings дёргаются на каждом /start и каждом callback —
+# перечитывать и декодировать файл каждый раз незачем, пока он не менялся.
+# Инвалидация по mtime: fetch/process пишут файлы из отдельных процессов,
+# поэтому сравниваем st_mtime_ns при каждом обращении (дешёвый stat).
+_JSON_CACHE = {}
+
+
+def _cached_json(path, default):
+    """Читает и парсит JSON-файл с кэшированием по mtime."""
+    try:
+        if not path.exists():
+            return default
+        mtime = path.stat().st_mtime_ns
+        cached = _JSON_CACHE.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        # read_bytes + _json_loads: один syscall без TextIOWrapper-декодирования
+        data = _json_loads(path.read_bytes())
+        _JSON_CACHE[path] = (mtime, data)
+        return data
+    except Exception as e:
+        print(f"⚠️  Ошибка загрузки {path}: {e}")
+        return default
+
+
 # Загружаем новости
 def load_news():
     """Загружает обработанные новости из result_news.json"""
-    try:
-        if not RESULT_NEWS_FILE.exists():
-            print(f"ℹ️  Файл {RESULT_NEWS_FILE} не существует, возвращаем пустой список")
-            return []
-        with open(RESULT_NEWS_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            return data if isinstance(data, list) else []
-    except Exception as e:
-        print(f"⚠️  Ошибка загрузки {RESULT_NEWS_FILE}: {e}")
-        return []
+    data = _cached_json(RESULT_NEWS_FILE, [])
+    return data if isinstance(data, list) else []
 
 def load_rejected_news():
     """Загружает отклоненные новости из rejected_news.json"""
-    try:
-        if not REJECTED_NEWS_FILE.exists():
-            return []
-        with open(REJECTED_NEWS_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            return data if isinstance(data, list) else []
-    except Exception as e:
-        print(f"⚠️  Ошибка загрузки {REJECTED_NEWS_FILE}: {e}")
-        return []
+    data = _cached_json(REJECTED_NEWS_FILE, [])
+    return data if isinstance(data, list) else []
 
 def load_settings():
-    try:
-        with open(SETTINGS_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {"mode": "manual"}
+    data = _cached_json(SETTINGS_FILE, None)
+    return data if isinstance(data, dict) else {"mode": "manual"}
 
 def save_settings(settings):
-    with open(SETTINGS_FILE, "w", encoding="utf-8") as f:
-        json.dump(settings, f, indent=2)
+    SETTINGS_FILE.write_bytes(_json_dumps_bytes(settings))
+    # Обновляем кэш сразу, не дожидаясь следующего stat
+    _JSON_CACHE[SETTINGS_FILE] = (SETTINGS_FILE.stat().st_mtime_ns, settings)
+
+
+def _cache_is_fresh(path):
+    """True, если для path есть кэш и файл с тех пор не менялся (по mtime)."""
+    cached = _JSON_CACHE.get(path)
+    if cached is None:
+        return False
+    try:
+        return path.stat().st_mtime_ns == cached[0]
+    except OSError:
+        return False
+
+
+# Async-обёртки для вызова из хэндлеров: диск (особенно сетевой/медленный)
+# не должен блокировать event loop — пока идёт чтение, loop продолжает
+# обрабатывать апдейты. При тёплом кэше в thread pool не ходим вовсе:
+# один stat на loop-потоке дешевле переключения в поток и обратно.
+async def load_news_async():
+    if _cache_is_fresh(RESULT_NEWS_FILE):
+        return load_news()
+    return await asyncio.to_thread(load_news)
+
+
+async def load_rejected_news_async():
+    if _cache_is_fresh(REJECTED_NEWS_FILE):
+        return load_rejected_news()
+    return await asyncio.to_thread(load_rejected_news)
+
+
+async def load_settings_async():
+    if _cache_is_fresh(SETTINGS_FILE):
+        return load_settings()
+    return await asyncio.to_thread(load_settings)
+
+
+async def save_settings_async(settings):
+    await asyncio.to_thread(save_settings, settings)
+
+# Клавиатуры статичны — собираем их один раз при импорте, а не на каждую
+# новость/каждый callback (InlineKeyboardButton валидирует аргументы при
+# каждом создании, это лишние аллокации на самом горячем пути).
+_NEWS_KEYBOARD = InlineKeyboardMarkup([
+    [
+        InlineKeyboardButton("Опубликовать сейчас", callback_data="0"),
+        InlineKeyboardButton("Через 30 мин", callback_data="30"),
+    ],
+    [
+        InlineKeyboardButton("1 час", callback_data="60"),
+        InlineKeyboardButton("2 часа", callback_data="120"),
+        InlineKeyboardButton("3 часа", callback_data="180"),
+    ],
+    [
+        InlineKeyboardButton("⏭️ Пропустить", callback_data="skip"),
+    ]
+])
+
+# Клавиатура выбора режима: два готовых варианта (галочка у активного режима)
+_MODE_KEYBOARDS = {
+    mode: InlineKeyboardMarkup([[
+        InlineKeyboardButton(f"{'✅ ' if mode == 'manual' else ''}Ручной режим", callback_data="mode_manual"),
+        InlineKeyboardButton(f"{'✅ ' if mode == 'auto' else ''}Автоматический", callback_data="mode_auto"),
+    ]])
+    for mode in ("manual", "auto")
+}
+
+
+async def send_message_limited(bot, chat_id, **kwargs):
+    """bot.send_message с соблюдением лимитов Telegram (token bucket)."""
+    await acquire_send_slot(chat_id)
+    return await bot.send_message(chat_id=chat_id, **kwargs)
 
-def escape_markdown(text):
-    """
-    Экранирует специальные символы Markdown для Telegram.
-    Оставляет только намеренно используемые символы форматирования.
-    """
-    # Символы, которые нужно экранировать в MarkdownV2
-    # Но мы используем обычный Markdown, поэтому экранируем только проблемные
-    # символы, которые могут создать незакрытые entities
-    
-    # Заменяем одиночные * и _ на экранированные версии
-    # но сохраняем парные для форматирования
-    result = text
-    
-    # Временно заменяем наши намеренные маркеры
-    result = result.replace('📰 *', '📰 __BOLD_START__')
-    result = result.replace('*\n', '__BOLD_END__\n')
-    
-    # Экранируем все остальные звездочки и подчеркивания
-    result = result.replace('*', '\\*')
-    result = result.replace('_', '\\_')
-    
-    # Возвращаем наши маркеры
-    result = result.replace('__BOLD_START__', '*')
-    result = result.replace('__BOLD_END__', '*')
-    
-    # Дополнительно экранируем другие проблемные символы
-    result = result.replace('[', '\\[')
-    result = result.replace(']', '\\]')
-    result = result.replace('(', '\\(')
-    result = result.replace(')', '\\)')
-    
-    return result
 
 def build_news_body(news_item):
     """
     Собирает тело карточки новости: эмодзи-рубрика + жирный заголовок,
     короткие буллиты, хэштеги. Без ссылки на источник (её добавляет format_news_text).
+    HTML-разметка (как в дайджесте): legacy-Markdown ломался на непарных
+    */_ в тексте и заставлял Telegram отклонять сообщение — html.escape
+    при сборке снимает проблему раз и навсегда.
     Поддерживает и новый формат (bullets), и старый (description).
     """
-    title = news_item.get('title', '').replace('`', '')
+    title = html.escape(news_item.get('title', ''))
     emoji = category_emoji(news_item.get('category'))
 
     bullets = news_item.get('bullets')
     if isinstance(bullets, list) and bullets:
-        body = "\n".join(f"▪️ {str(b).replace('`', '')}" for b in bullets)
+        body = "\n".join(f"▪️ {html.escape(str(b))}" for b in bullets)
     else:
         # Обратная совместимость со старым форматом
-        body = news_item.get('description', '').replace('`', '')
+        body = html.escape(news_item.get('description', ''))
 
-    parts = [f"{emoji} *{title}*", "", body]
+    parts = [f"{emoji} <b>{title}</b>", "", body]
 
     hashtags = news_item.get('hashtags')
     if isinstance(hashtags, list) and hashtags:
         parts.append("")
-        parts.append(" ".join(hashtags[:4]))
+        parts.append(" ".join(html.escape(str(h)) for h in hashtags[:4]))
 
     return "\n".join(parts)
 
 
 def format_news_text(news_item, max_length=MAX_MESSAGE_LENGTH):
     """
-    Форматирует новость для Telegram с автоматической обрезкой при необходимости
+    Форматирует новость для Telegram (HTML) с автоматической обрезкой при
+    необходимости. Обрезается только тело — ссылка на источник добавляется
+    после, чтобы обрезка не разорвала тег <a>.
+    Результат мемоизируется прямо на dict новости: одна и та же карточка
+    форматируется и при показе админу, и при публикации — собирать строку
+    (и пересчитывать обрезку) второй раз незачем.
     """
+    if max_length == MAX_MESSAGE_LENGTH:
+        cached = news_item.get("_formatted")
+        if cached is not None:
+            return cached
+
     body = build_news_body(news_item)
-    text = f"{body}\n\n🔗 [Ссылка на источник]({news_item['link']})"
+    link_part = f'\n\n🔗 <a href="{html.escape(news_item.get("link", ""), quote=True)}">Ссылка на источник</a>'
 
     # Проверяем длину и обрезаем при необходимости
-    if len(text) <= max_length:
-        return text
-
-    # Резервируем место для сообщения об обрезке
-    truncate_suffix = "\n\n... _(текст обрезан из-за ограничений Telegram)_"
-    available_length = max_length - len(truncate_suffix)
-
-    # Обрезаем текст
-    truncated = text[:available_length]
+    if len(body) + len(link_part) > max_length:
+        # Резервируем место для сообщения об обрезке и ссылки
+        truncate_suffix = "\n\n... <i>(текст обрезан из-за ограничений Telegram)</i>"
+        available_length = max_length - len(truncate_suffix) - len(link_part)
+
+        # Обрезаем текст
+        truncated = body[:available_length]
+
+        # Пытаемся обрезать по последнему полному предложению или слову.
+        # rfind со стартовой границей сканирует только хвост, в котором
+        # точка/пробел вообще приемлемы, а не все 4000 символов.
+        last_period = truncated.rfind('.', int(available_length * 0.8) + 1)
+        if last_period != -1:  # Точка близко к концу
+            truncated = truncated[:last_period + 1]
+        else:
+            last_space = truncated.rfind(' ', int(available_length * 0.9) + 1)
+            if last_space != -1:  # Пробел близко к концу
+                truncated = truncated[:last_space]
 
-    # Пытаемся обрезать по последнему полному предложению или слову
-    last_period = truncated.rfind('.')
-    last_space = truncated.rfind(' ')
+        body = truncated + truncate_suffix
 
-    if last_period > available_length * 0.8:  # Если точка близко к концу
-        truncated = truncated[:last_period + 1]
-    elif last_space > available_length * 0.9:  # Если пробел близко к концу
-        truncated = truncated[:last_space]
+    text = body + link_part
 
-    return truncated + truncate_suffix
+    if max_length == MAX_MESSAGE_LENGTH:
+        news_item["_formatted"] = text
+    return text
 
 async def send_news_to_admin(application: Application):
     """Автоматически отправляет новости админу при запуске бота"""
-    news = load_news()
+    news = await load_news_async()
 
     if not ADMIN_CHAT_ID:
         print("⚠️  ADMIN_CHAT_ID не установлен в .env")
@@ -193,6 +286,7 @@ async def send_news_to_admin(application: Application):
 
     application.bot_data["news"] = news
     application.bot_data["index"] = 0
+    application.bot_data["session_done"] = False  # новая сессия модерации
 
     await send_next_news_to_admin(application)
 
@@ -204,17 +298,11 @@ def load_current_cycle_news(max_age_hours=3):
     (по метке processed_at), отсекая остатки прошлых циклов.
     """
     all_news = load_news()
-    current_time = time.time()
-    max_age_seconds = max_age_hours * 60 * 60
-
-    news = []
-    old_news_count = 0
-    for item in all_news:
-        age_seconds = current_time - item.get("processed_at", 0)
-        if age_seconds <= max_age_seconds:
-            news.append(item)
-        else:
-            old_news_count += 1
+    # Отсечку считаем один раз; list comprehension фильтрует в C-цикле
+    # интерпретатора вместо явного for+append на каждый элемент
+    cutoff = time.time() - max_age_hours * 60 * 60
+    news = [item for item in all_news if item.get("processed_at", 0) >= cutoff]
+    old_news_count = len(all_news) - len(news)
 
     if old_news_count > 0:
         print(f"🗑️  Отфильтровано {old_news_count} новостей из предыдущих циклов")
@@ -228,13 +316,14 @@ async def schedule_auto_posting(application: Application):
       • остальное                        → копим в буфер дайджеста.
     Публикацией дайджеста занимается publish_digest по расписанию (3 слота в день).
     """
-    news = load_current_cycle_news()
-    rejected = load_rejected_news()
+    news = await asyncio.to_thread(load_current_cycle_news)
+    rejected = await load_rejected_news_async()
 
     if not news:
         if ADMIN_CHAT_ID:
-            await application.bot.send_message(
-                chat_id=ADMIN_CHAT_ID,
+            await send_message_limited(
+                application.bot,
+                ADMIN_CHAT_ID,
                 text=(
                     f"ℹ️ Нет новостей из текущего цикла.\n"
                     f"🚫 Отклонено AI: {len(rejected)}\n"
@@ -246,7 +335,12 @@ async def schedule_auto_posting(application: Application):
     urgent = [n for n in news if n.get("importance", 0) >= URGENT_THRESHOLD]
     routine = [n for n in news if n.get("importance", 0) < URGENT_THRESHOLD]
 
-    # Срочные — сразу в канал (обходят тихие часы и дайджест)
+    # Срочные — сразу в канал (обходят тихие часы и дайджест).
+    # Строго последовательно: publish_news сверяет новость с историей
+    # публикаций и сразу пополняет её — при параллельном запуске две
+    # похожие новости одной пачки прошли бы проверку до первой записи
+    # в историю и обе ушли бы в канал (плюс несинхронизированная
+    # перезапись published_news.json).
     published_urgent = []
     for item in urgent:
         try:
@@ -270,8 +364,9 @@ async def schedule_auto_posting(application: Application):
             f"🚫 Отклонено AI: {len(rejected)}\n\n"
             f"*Срочные:*\n{urgent_summary}"
         )
-        await application.bot.send_message(
-            chat_id=ADMIN_CHAT_ID,
+        await send_message_limited(
+            application.bot,
+            ADMIN_CHAT_ID,
             text=report,
             parse_mode="Markdown"
         )
@@ -343,7 +438,10 @@ async def publish_digest(bot):
     fresh = []
     skipped_dup = 0
     for it in items:
-        dup = check_duplicate(
+        # Дисковое IO и difflib — в пуле потоков, чтобы не блокировать
+        # обработку callback'ов бота (как и остальное файловое IO здесь)
+        dup = await asyncio.to_thread(
+            check_duplicate,
             title=it.get("title", ""),
             text=it.get("description", ""),
             similarity_threshold=0.85,
@@ -363,8 +461,9 @@ async def publish_digest(bot):
     messages = build_digest_messages(fresh, header=header)
 
     for msg in messages:
-        await bot.send_message(
-            chat_id=CHANNEL_ID,
+        await send_message_limited(
+            bot,
+            CHANNEL_ID,
             text=msg,
             parse_mode="HTML",
             disable_web_page_preview=True,
@@ -372,7 +471,8 @@ async def publish_digest(bot):
 
     # Помечаем как опубликованные и чистим буфер
     for it in fresh:
-        add_published_news(
+        await asyncio.to_thread(
+            add_published_news,
             title=it.get("title", ""),
             text=it.get("description", ""),
             url=it.get("link", ""),
@@ -383,8 +483,9 @@ async def publish_digest(bot):
 
     if ADMIN_CHAT_ID:
         try:
-            await bot.send_message(
-                chat_id=ADMIN_CHAT_ID,
+            await send_message_limited(
+                bot,
+                ADMIN_CHAT_ID,
                 text=(
                     f"🗞 Дайджест опубликован\n"
                     f"✅ Новостей: {len(fresh)}\n"
@@ -404,50 +505,155 @@ async def publish_digest_job(bot):
     await publish_digest(bot)
 
 
+async def send_news_batch_to_admin(application: Application):
+    """
+    Батч-режим модерации (REVIEW_BATCH_SIZE > 1): одно сообщение на пачку
+    из K новостей, по ряду кнопок на каждую. Вместо N последовательных
+    round-trip'ов к Telegram на сессию — N/K.
+    """
+    news = application.bot_data.get("news", [])
+    idx = application.bot_data.get("index", 0)
+
+    if not news:
+        await send_message_limited(
+            application.bot,
+            ADMIN_CHAT_ID,
+            text="ℹ️ Нет новостей для проверки."
+        )
+        return
+
+    if idx >= len(news):
+        await send_message_limited(
+            application.bot,
+            ADMIN_CHAT_ID,
+            text="✅ Все новости просмотрены!"
+        )
+        application.bot_data["session_done"] = True
+        application.bot_data["news"] = []
+        return
+
+    blocks = []
+    keyboard = []
+    batch = []
+    total_len = 0
+    for k in range(idx, min(idx + REVIEW_BATCH_SIZE, len(news))):
+        num = len(batch) + 1
+        prefix = f"<b>#{num}</b> "
+        block = prefix + format_news_text(news[k])
+        if len(block) > MAX_MESSAGE_LENGTH:
+            # Карточка почти на лимите + префикс не влезают в одно сообщение:
+            # переформатируем с бюджетом за вычетом префикса — обрезка внутри
+            # format_news_text не рвёт HTML-теги
+            block = prefix + format_news_text(news[k], max_length=MAX_MESSAGE_LENGTH - len(prefix))
+        if batch and total_len + len(block) + 2 > MAX_MESSAGE_LENGTH:
+            break  # не влезает — остаток уйдёт следующей пачкой
+        blocks.append(block)
+        total_len += len(block) + 2
+        keyboard.append([
+            InlineKeyboardButton(f"#{num} ✅ Сейчас", callback_data=f"pub_{k}"),
+            InlineKeyboardButton("30м", callback_data=f"dly_{k}_30"),
+            InlineKeyboardButton("1ч", callback_data=f"dly_{k}_60"),
+            InlineKeyboardButton("⏭", callback_data=f"skip_{k}"),
+        ])
+        batch.append(k)
+
+    await send_message_limited(
+        application.bot,
+        ADMIN_CHAT_ID,
+        text="\n\n".join(blocks),
+        reply_markup=InlineKeyboardMarkup(keyboard),
+        parse_mode="HTML",
+        disable_web_page_preview=True,
+    )
+
+    # Индекс двигаем только после доставки: если отправка упала, пачка не
+    # пропускается молча — следующий вызов соберёт её заново
+    application.bot_data["index"] = batch[-1] + 1
+    application.bot_data["batch_pending"] = set(batch)
+
+
+async def handle_batch_action(query, context):
+    """Обрабатывает кнопку батч-режима: pub_{k} / dly_{k}_{мин} / skip_{k}."""
+    news = context.application.bot_data.get("news", [])
+    parts = query.data.split("_")
+    action, k = parts[0], int(parts[1])
+
+    if k >= len(news):
+        await query.answer("⚠️ Новость уже недоступна")
+        return
+    n = news[k]
+
+    if action == "pub":
+        await query.answer(f"✅ Публикуем: {n['title'][:40]}")
+        await publish_news(context.bot, n)
+    elif action == "dly":
+        delay_minutes = int(parts[2])
+        await query.answer(f"⏰ Через {delay_minutes} мин: {n['title'][:40]}")
+        scheduler = context.application.bot_data.get("scheduler")
+        if scheduler:
+            scheduler.add_job(
+                publish_news,
+                "date",
+                run_date=datetime.now(LOCAL_TZ) + timedelta(minutes=delay_minutes),
+                args=[context.bot, n],
+                id=f"manual_post_{k}_{int(time.time())}",
+                replace_existing=True,
+            )
+        else:
+            asyncio.create_task(schedule_post(context, n, delay_minutes))
+    else:  # skip
+        await query.answer(f"⏭️ Пропущено: {n['title'][:40]}")
+
+    # Когда все новости пачки обработаны — показываем следующую пачку
+    pending = context.application.bot_data.get("batch_pending")
+    if pending is not None:
+        pending.discard(k)
+        if not pending:
+            await send_news_batch_to_admin(context.application)
+
+
 async def send_next_news_to_admin(application: Application):
     """Отправляет следующую новость админу"""
+    # Сессия уже закрыта — не шлём «всё просмотрено» повторно на каждый клик
+    if application.bot_data.get("session_done"):
+        return
+
+    if REVIEW_BATCH_SIZE > 1:
+        await send_news_batch_to_admin(application)
+        return
+
     news = application.bot_data.get("news", [])
     idx = application.bot_data.get("index", 0)
 
     if not news:
-        await application.bot.send_message(
-            chat_id=ADMIN_CHAT_ID,
+        await send_message_limited(
+            application.bot,
+            ADMIN_CHAT_ID,
             text="ℹ️ Нет новостей для проверки."
         )
         return
 
     if idx >= len(news):
-        await application.bot.send_message(
-            chat_id=ADMIN_CHAT_ID,
+        await send_message_limited(
+            application.bot,
+            ADMIN_CHAT_ID,
             text="✅ Все новости просмотрены!"
         )
-
+        # Закрываем сессию и отпускаем список (вместе с мемоизированными
+        # _formatted-строками) — до следующего /start или цикла он не нужен
+        application.bot_data["session_done"] = True
+        application.bot_data["news"] = []
         return
 
     n = news[idx]
     text = format_news_text(n)
 
-    keyboard = [
-        [
-            InlineKeyboardButton("Опубликовать сейчас", callback_data="0"),
-            InlineKeyboardButton("Через 30 мин", callback_data="30"),
-        ],
-        [
-            InlineKeyboardButton("1 час", callback_data="60"),
-            InlineKeyboardButton("2 часа", callback_data="120"),
-            InlineKeyboardButton("3 часа", callback_data="180"),
-        ],
-        [
-            InlineKeyboardButton("⏭️ Пропустить", callback_data="skip"),
-        ]
-    ]
-
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    await application.bot.send_message(
-        chat_id=ADMIN_CHAT_ID,
+    await send_message_limited(
+        application.bot,
+        ADMIN_CHAT_ID,
         text=text,
-        reply_markup=reply_markup,
-        parse_mode="Markdown",
+        reply_markup=_NEWS_KEYBOARD,
+        parse_mode="HTML",
         disable_web_page_preview=False
     )
 
@@ -460,20 +666,12 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         print(f"⚠️  Попытка доступа от неразрешенного пользователя: {user_id}")
         return
 
-    settings = load_settings()
+    settings = await load_settings_async()
     current_mode = settings.get("mode", "manual")
-    
-    keyboard = [
-        [
-            InlineKeyboardButton(f"{'✅ ' if current_mode == 'manual' else ''}Ручной режим", callback_data="mode_manual"),
-            InlineKeyboardButton(f"{'✅ ' if current_mode == 'auto' else ''}Автоматический", callback_data="mode_auto"),
-        ]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
 
     await update.message.reply_text(
-        f"🤖 Бот управления новостями\nТекущий режим: *{current_mode}*", 
-        reply_markup=reply_markup,
+        f"🤖 Бот управления новостями\nТекущий режим: *{current_mode}*",
+        reply_markup=_MODE_KEYBOARDS.get(current_mode, _MODE_KEYBOARDS["manual"]),
         parse_mode="Markdown"
     )
     
@@ -490,6 +688,11 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         print(f"⚠️  Попытка взаимодействия от неразрешенного пользователя: {user_id}")
         return
 
+    # Кнопки батч-режима отвечают на callback сами (с тостом-подтверждением)
+    if query.data.startswith(("pub_", "dly_", "skip_")):
+        await handle_batch_action(query, context)
+        return
+
     await query.answer()
 
     news = context.application.bot_data.get("news", [])
@@ -498,21 +701,13 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # Обработка смены режима
     if query.data.startswith("mode_"):
         new_mode = query.data.split("_")[1]
-        settings = load_settings()
+        settings = await load_settings_async()
         settings["mode"] = new_mode
-        save_settings(settings)
-        
-        keyboard = [
-            [
-                InlineKeyboardButton(f"{'✅ ' if new_mode == 'manual' else ''}Ручной режим", callback_data="mode_manual"),
-                InlineKeyboardButton(f"{'✅ ' if new_mode == 'auto' else ''}Автоматический", callback_data="mode_auto"),
-            ]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
+        await save_settings_async(settings)
+
         await query.edit_message_text(
             f"🤖 Бот управления новостями\nТекущий режим: *{new_mode}*\n\n✅ Режим изменен!",
-            reply_markup=reply_markup,
+            reply_markup=_MODE_KEYBOARDS.get(new_mode, _MODE_KEYBOARDS["manual"]),
             parse_mode="Markdown"
         )
         return
@@ -531,16 +726,33 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         else:
             # Планируем отправку в фоне
             await query.edit_message_text(f"✅ Запланировано: {n['title']} (через {delay_minutes} мин)")
-            asyncio.create_task(schedule_post(context, n, delay_minutes))
+            scheduler = context.application.bot_data.get("scheduler")
+            if scheduler:
+                # Отложенный пост живёт одной записью в куче планировщика,
+                # а не отдельной корутиной, спящей до 3 часов (каждая такая
+                # таска держит фрейм + ссылку на context всё время ожидания)
+                scheduler.add_job(
+                    publish_news,
+                    "date",
+                    run_date=datetime.now(LOCAL_TZ) + timedelta(minutes=delay_minutes),
+                    args=[context.bot, n],
+                    id=f"manual_post_{idx}_{int(time.time())}",
+                    replace_existing=True,
+                )
+            else:
+                # Запуск без планировщика (standalone bot_posting.py)
+                asyncio.create_task(schedule_post(context, n, delay_minutes))
 
     context.application.bot_data["index"] = idx + 1
-    await asyncio.sleep(1)
+    # Без секундной паузы: ответ на callback уже ушёл, следующую карточку
+    # показываем сразу — на сессии из N новостей пауза стоила N секунд
     await send_next_news_to_admin(context.application)
 
 async def publish_news(bot, news_item):
     """Публикует новость в канал"""
     # Проверяем на дубликат перед публикацией
-    duplicate_check = check_duplicate(
+    duplicate_check = await asyncio.to_thread(
+        check_duplicate,
         title=news_item.get('title', ''),
         text=news_item.get('description', ''),
         similarity_threshold=0.85
@@ -561,8 +773,9 @@ async def publish_news(bot, news_item):
         # Уведомляем админа о пропуске дубликата
         if ADMIN_CHAT_ID:
             try:
-                await bot.send_message(
-                    chat_id=ADMIN_CHAT_ID,
+                await send_message_limited(
+                    bot,
+                    ADMIN_CHAT_ID,
                     text=(
                         f"🚫 *Дубликат пропущен*\n\n"
                         f"📰 {news_item.get('title', '')[:100]}\n\n"
@@ -575,18 +788,21 @@ async def publish_news(bot, news_item):
                 print(f"Ошибка отправки уведомления админу: {e}")
         return
     
-    # Публикуем новость
+    # Публикуем новость (текст уже мемоизирован на dict, если карточка
+    # форматировалась при показе админу — строка не собирается заново)
     text = format_news_text(news_item)
 
-    await bot.send_message(
-        chat_id=CHANNEL_ID,
+    await send_message_limited(
+        bot,
+        CHANNEL_ID,
         text=text,
-        parse_mode="Markdown",
+        parse_mode="HTML",
         disable_web_page_preview=False
     )
     
     # Добавляем в историю опубликованных новостей
-    add_published_news(
+    await asyncio.to_thread(
+        add_published_news,
         title=news_item.get('title', ''),
         text=news_item.get('description', ''),
         url=news_item.get('link', '')
@@ -46,7 +46,12 @@ def clear_pending() -> None:
 def _is_dup_title(title: str, existing_titles: list) -> bool:
     t = (title or "").lower()
     for seen in existing_titles:
-        if SequenceMatcher(None, t, (seen or "").lower()).ratio() > BUFFER_DUP_THRESHOLD:
+        s = (seen or "").lower()
+        # Дешёвая отсечка по длине: ratio() <= 2*min(len)/(сумма длин),
+        # сильно различающиеся по длине заголовки не сравниваем вовсе
+        if 2 * min(len(t), len(s)) <= BUFFER_DUP_THRESHOLD * (len(t) + len(s)):
+            continue
+        if SequenceMatcher(None, t, s).ratio() > BUFFER_DUP_THRESHOLD:
             return True
     return False
 
@@ -1,11 +1,71 @@
 import feedparser
+import io
 import json
+import re
+import requests
+import lxml.html
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dateutil import parser as dateparser
 from datetime import datetime, timedelta, timezone
-from bs4 import BeautifulSoup
+from email.utils import parsedate_to_datetime
+from lxml import etree
 from url_tracker import URLTracker
 from paths import DATA_DIR
 
+# orjson (C-расширение) сериализует списки словарей в разы быстрее стандартного
+# json; файл пишем байтами. При отсутствии пакета — обычный json, как раньше.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# pyahocorasick (C-расширение): все ключевые слова ищутся за ОДИН проход по
+# тексту вместо отдельного substring-поиска на каждое слово. Опционален —
+# без него используется компилированное regex-объединение (тоже один проход).
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+class KeywordMatcher:
+    """Однопроходный поиск набора подстрок в тексте (Aho-Corasick или regex)."""
+
+    def __init__(self, keywords):
+        # Ключевые слова сравниваем с уже lower-нутым текстом, поэтому
+        # нормализуем и сами слова (в списках встречаются заглавные буквы);
+        # заодно убираем дубли — в списках есть повторы ("montero", "santander")
+        keywords = sorted({kw.lower() for kw in keywords})
+        if ahocorasick is not None:
+            auto = ahocorasick.Automaton()
+            for kw in keywords:
+                auto.add_word(kw, kw)
+            auto.make_automaton()
+            self._auto = auto
+            self._re = None
+        else:
+            self._auto = None
+            # Для count_distinct список нужен целиком: альтернация «съедает»
+            # вложенные ключи ("descuento" внутри "% de descuento"), а
+            # Aho-Corasick находит оба — счёт должен совпадать в обоих путях
+            self._keywords = keywords
+            # Длинные альтернативы первыми, чтобы findall находил максимальные
+            self._re = re.compile("|".join(map(re.escape, sorted(keywords, key=len, reverse=True))))
+
+    def search(self, text_lower) -> bool:
+        """True, если в тексте есть хотя бы одно из ключевых слов."""
+        if self._auto is not None:
+            for _ in self._auto.iter(text_lower):
+                return True
+            return False
+        return self._re.search(text_lower) is not None
+
+    def count_distinct(self, text_lower) -> int:
+        """Сколько РАЗНЫХ ключевых слов встретилось в тексте."""
+        if self._auto is not None:
+            return len({kw for _, kw in self._auto.iter(text_lower)})
+        return sum(1 for kw in self._keywords if kw in text_lower)
+
 NEWS_RAW_FILE = DATA_DIR / "news_raw.json"
 
 # RSS источники
@@ -15,8 +75,49 @@ RSS_FEEDS = [
     # можно добавить ещё
 ]
 
+# Типичный RSS-фрагмент — пара сотен байт с максимум одним <img>: хватает
+# компилированного regex, дерево строить незачем
+_IMG_SRC_RE = re.compile(r'<img[^>]+src=["\']([^"\']+)["\']', re.IGNORECASE)
+
+
+def _first_img_src(markup):
+    """
+    Первый <img src=...> из HTML-фрагмента. Сначала быстрый путь через
+    regex (покрывает подавляющее большинство фидов), при промахе —
+    честный разбор через lxml (например, если src идёт без кавычек
+    или HTML сильно поломан).
+    """
+    if not markup or "<img" not in markup:
+        return None
+    m = _IMG_SRC_RE.search(markup)
+    if m:
+        return m.group(1)
+    try:
+        srcs = lxml.html.fragment_fromstring(markup, create_parent=True).xpath('.//img/@src')
+        return srcs[0] if srcs else None
+    except Exception:
+        return None
+
+
+# Мемоизация extract_image по ссылке записи: один и тот же материал может
+# прийти из нескольких фидов одного издания за прогон. Кэш живёт в памяти
+# процесса; между прогонами повторную работу отсекает URL-трекер, так что
+# дисковый слой не нужен.
+_IMAGE_CACHE = {}
+
+
 def extract_image(entry):
     """Извлекает первую подходящую картинку из разных полей RSS item"""
+    link = entry.get("link") if hasattr(entry, "get") else None
+    if link and link in _IMAGE_CACHE:
+        return _IMAGE_CACHE[link]
+    image = _extract_image_uncached(entry)
+    if link:
+        _IMAGE_CACHE[link] = image
+    return image
+
+
+def _extract_image_uncached(entry):
     # 1️⃣ media:thumbnail
     if "media_thumbnail" in entry and len(entry.media_thumbnail) > 0:
         return entry.media_thumbnail[0].get("url")
@@ -35,171 +136,165 @@ def extract_image(entry):
 
     # 4️⃣ внутри контента ищем <img>
     if "content" in entry and len(entry.content) > 0:
-        html = entry.content[0].value
-        soup = BeautifulSoup(html, "html.parser")
-        img = soup.find("img")
-        if img and img.get("src"):
-            return img["src"]
+        src = _first_img_src(entry.content[0].value)
+        if src:
+            return src
 
     # 5️⃣ в description
     if "description" in entry:
-        soup = BeautifulSoup(entry.description, "html.parser")
-        img = soup.find("img")
-        if img and img.get("src"):
-            return img["src"]
+        src = _first_img_src(entry.description)
+        if src:
+            return src
 
     return None
 
 
-def is_spain_related(text):
-    """Проверяет, связана ли новость с Испанией"""
-    text_lower = text.lower()
-    
-    # Длинные ключевые слова (можно искать как подстроку)
-    spain_keywords = [
-         # страны/регионы/автономные сообщества
-        "españ", "españa", "madrid", 'valéncia', "barcelona", "valencia", "sevilla", "zaragoza", "bilbao",
-        "andalucía", "cataluña", "galicia", "pais vasco", "país vasco", "comunidad valenciana",
-        "castilla", "castilla y león", "castilla-la mancha", "la mancha", "navarra", "murcia", 
-        "asturias", "cantabria", "aragón", "extremadura", "la rioja", "rioja",
-        "baleares", "islas baleares", "canarias", "islas canarias",
-        
-        # 100 городов Испании
-        "málaga", "palma", "las palmas", "alicante", "córdoba", "valladolid", "vigo", "gijón",
-        "hospitalet", "vitoria", "coruña", "granada", "elche", "oviedo", "badalona", "cartagena",
-        "terrassa", "jerez", "sabadell", "móstoles", "santa cruz", "pamplona", "almería", "fuenlabrada",
-        "leganés", "getafe", "alcalá", "burgos", "salamanca", "san sebastián", "logroño", "badajoz",
-        "albacete", "santander", "castellón", "alcorcón", "tarragona", "león", "cádiz", "huelva",
-        "marbella", "mataró", "jaén", "parla", "algeciras", "torrejón", "ourense", "reus",
-        "telde", "barakaldo", "lugo", "san fernando", "girona", "cáceres", "lorca", "coslada",
-        "talavera", "el ejido", "torrevieja", "ávila", "palencia", "guadalajara", "melilla", "ceuta",
-        "pontevedra", "manresa", "roquetas", "linares", "alcobendas", "zamora", "segovia", "cuenca",
-        "torremolinos", "ronda", "benidorm", "aranjuez", "estepona", "alcoy", "gandía", "chiclana",
-        "ferrol", "vélez", "elda", "toledo", "ponferrada", "puerto real", "benalmádena", "orihuela",
-        "sagunto", "utrera", "torrent", "la línea", "motril", "paterna", "puertollano", "cornellá",
-        "molina", "pozuelo", "rubí", "villanueva", "rivas",
-
-        # органы власти
-        "gobierno", "ayuntamiento", "comunidad autónoma",
-        "policía nacional", "guardia civil", "tribunal supremo",
-        "audiencia nacional", "seguridad social", "hacienda",
-
-        # испанские компании
-        "bbva", "santander", "caixabank", "iberdrola", "repsol", "endesa",
-
-        # известные люди Испании (политики, королевская семья, бизнес, спорт, культура)
-        # Политики
-        "sánchez", "ayuso", "feijóo", "abascal", "yolanda díaz", "iglesias", "montero",
-        "García-Page", "moreno bonilla", "mazón", "aragonés", "urkullu", "revilla",
-        "García albiol", "edmundo bal", "espinosa de los monteros", "macarena olona",
-        "rufián", "puigdemont", "junqueras", "arrimadas", "borrell", "calviño",
-        "escrivá", "marlaska", "robles", "ribera", "bolaños", "alegría",
-        "albares", "planas", "cuerpo", "urtasun", "montero", "belarra",
-        
-        # Королевская семья
-        "felipe vi", "letizia", "leonor", "sofía", "juan carlos", "cristina de borbón",
-        "iñaki urdangarin", "froilán",
-        
-        # Судьи и прокуроры
-        "garcía castellón", "peinado", "marchena", "lesmes", "dolores delgado",
-        "álvaro garcía", "garcía ortiz", "conde-pumpido",
-        
-        # Бизнесмены
-        "amancio ortega", "sandra ortega", "botín", "Ana botín", "isak andic",
-        "florentino pérez", "francisco gonzález", "juan roig", "del pino",
-        "miguel fluxá", "entrecanales", "alierta", "álvarez",
-        
-        # Футболисты и тренеры
-        "ancelotti", "xavi", "vinicius", "benzema", "modric", "kroos", "bellingham",
-        "mbappé", "lewandowski", "ter stegen", "pedri", "gavi", "morata", "rodrigo",
-        "rodri", "carvajal", "nacho", "yamal", "ansu fati", "ferran torres",
-        "griezmann", "koke", "oblak", "courtois", "valverde", "camavinga",
-        
-        # Другие спортсмены
-        "alcaraz", "nadal", "gasol", "lorenzo", "sainz", "alonso", "márquez",
-        "mir", "belmonte", "craviotto",
-        
-        # Журналисты и медиа
-        "ana rosa", "susanna griso", "carlos herrera", "alsina", "ferreras",
-        "ana pastor", "évole", "buenafuente", "broncano", "pablo motos",
-        "sandra golpe", "matías prats", "iker jiménez", "carmen porter",
-        
-        # Культура и искусство
-        "almodóvar", "penélope cruz", "javier bardem", "antonio banderas",
-        "rosalía", "alejandro sanz", "pablo alborán", "bisbal",
-    ]
-    
-    # Короткие аббревиатуры (нужна проверка границ слов)
-    import re
-    short_abbrev = ["psoe", "pp", "vox", "sumar", "podemos", "erc", "junts"]
-    
-    # Проверяем длинные ключевые слова
-    if any(keyword in text_lower for keyword in spain_keywords):
+# Длинные ключевые слова (можно искать как подстроку).
+# Все списки ниже — неизменяемые кортежи: наполнение фиксируется при импорте,
+# матчеры по ним строятся один раз.
+SPAIN_KEYWORDS = (
+     # страны/регионы/автономные сообщества
+    "españ", "españa", "madrid", 'valéncia', "barcelona", "valencia", "sevilla", "zaragoza", "bilbao",
+    "andalucía", "cataluña", "galicia", "pais vasco", "país vasco", "comunidad valenciana",
+    "castilla", "castilla y león", "castilla-la mancha", "la mancha", "navarra", "murcia",
+    "asturias", "cantabria", "aragón", "extremadura", "la rioja", "rioja",
+    "baleares", "islas baleares", "canarias", "islas canarias",
+
+    # 100 городов Испании
+    "málaga", "palma", "las palmas", "alicante", "córdoba", "valladolid", "vigo", "gijón",
+    "hospitalet", "vitoria", "coruña", "granada", "elche", "oviedo", "badalona", "cartagena",
+    "terrassa", "jerez", "sabadell", "móstoles", "santa cruz", "pamplona", "almería", "fuenlabrada",
+    "leganés", "getafe", "alcalá", "burgos", "salamanca", "san sebastián", "logroño", "badajoz",
+    "albacete", "santander", "castellón", "alcorcón", "tarragona", "león", "cádiz", "huelva",
+    "marbella", "mataró", "jaén", "parla", "algeciras", "torrejón", "ourense", "reus",
+    "telde", "barakaldo", "lugo", "san fernando", "girona", "cáceres", "lorca", "coslada",
+    "talavera", "el ejido", "torrevieja", "ávila", "palencia", "guadalajara", "melilla", "ceuta",
+    "pontevedra", "manresa", "roquetas", "linares", "alcobendas", "zamora", "segovia", "cuenca",
+    "torremolinos", "ronda", "benidorm", "aranjuez", "estepona", "alcoy", "gandía", "chiclana",
+    "ferrol", "vélez", "elda", "toledo", "ponferrada", "puerto real", "benalmádena", "orihuela",
+    "sagunto", "utrera", "torrent", "la línea", "motril", "paterna", "puertollano", "cornellá",
+    "molina", "pozuelo", "rubí", "villanueva", "rivas",
+
+    # органы власти
+    "gobierno", "ayuntamiento", "comunidad autónoma",
+    "policía nacional", "guardia civil", "tribunal supremo",
+    "audiencia nacional", "seguridad social", "hacienda",
+
+    # испанские компании
+    "bbva", "santander", "caixabank", "iberdrola", "repsol", "endesa",
+
+    # известные люди Испании (политики, королевская семья, бизнес, спорт, культура)
+    # Политики
+    "sánchez", "ayuso", "feijóo", "abascal", "yolanda díaz", "iglesias", "montero",
+    "García-Page", "moreno bonilla", "mazón", "aragonés", "urkullu", "revilla",
+    "García albiol", "edmundo bal", "espinosa de los monteros", "macarena olona",
+    "rufián", "puigdemont", "junqueras", "arrimadas", "borrell", "calviño",
+    "escrivá", "marlaska", "robles", "ribera", "bolaños", "alegría",
+    "albares", "planas", "cuerpo", "urtasun", "montero", "belarra",
+
+    # Королевская семья
+    "felipe vi", "letizia", "leonor", "sofía", "juan carlos", "cristina de borbón",
+    "iñaki urdangarin", "froilán",
+
+    # Судьи и прокуроры
+    "garcía castellón", "peinado", "marchena", "lesmes", "dolores delgado",
+    "álvaro garcía", "garcía ortiz", "conde-pumpido",
+
+    # Бизнесмены
+    "amancio ortega", "sandra ortega", "botín", "Ana botín", "isak andic",
+    "florentino pérez", "francisco gonzález", "juan roig", "del pino",
+    "miguel fluxá", "entrecanales", "alierta", "álvarez",
+
+    # Футболисты и тренеры
+    "ancelotti", "xavi", "vinicius", "benzema", "modric", "kroos", "bellingham",
+    "mbappé", "lewandowski", "ter stegen", "pedri", "gavi", "morata", "rodrigo",
+    "rodri", "carvajal", "nacho", "yamal", "ansu fati", "ferran torres",
+    "griezmann", "koke", "oblak", "courtois", "valverde", "camavinga",
+
+    # Другие спортсмены
+    "alcaraz", "nadal", "gasol", "lorenzo", "sainz", "alonso", "márquez",
+    "mir", "belmonte", "craviotto",
+
+    # Журналисты и медиа
+    "ana rosa", "susanna griso", "carlos herrera", "alsina", "ferreras",
+    "ana pastor", "évole", "buenafuente", "broncano", "pablo motos",
+    "sandra golpe", "matías prats", "iker jiménez", "carmen porter",
+
+    # Культура и искусство
+    "almodóvar", "penélope cruz", "javier bardem", "antonio banderas",
+    "rosalía", "alejandro sanz", "pablo alborán", "bisbal",
+)
+
+# Короткие аббревиатуры (нужна проверка границ слов) — один компилированный
+# regex вместо отдельного re.search на каждую аббревиатуру
+SHORT_ABBREV_RE = re.compile(r'\b(?:psoe|pp|vox|sumar|podemos|erc|junts)\b')
+
+# Сильные рекламные маркеры (если есть хотя бы один - точно реклама)
+STRONG_AD_KEYWORDS = (
+    'comprar ahora', 'compra ahora', 'cómpralo',
+    'haz clic aquí', 'pincha aquí',
+    'solicita', 'solicitud gratuita',
+    'llama ahora', 'contacta ahora',
+    'visita nuestra tienda',
+    'añadir al carrito',
+    'pagar ahora',
+)
+
+# Слабые рекламные маркеры (нужно несколько)
+WEAK_AD_KEYWORDS = (
+    'oferta', 'descuento', 'promoción', 'rebaja',
+    'precio especial', 'precio reducido',
+    'ahorra', '% de descuento', 'gratis',
+    'patrocinado', 'publicidad', 'anuncio',
+    'suscríbete', 'suscripción', 'prueba gratis',
+    'hasta agotar', 'por tiempo limitado',
+    'liquidación', 'outlet', 'chollazo',
+)
+
+ISRAEL_KEYWORDS = (
+    "israel", "israelí", "israelíes", "israelo",
+    "gaza", "franja de gaza", "cisjordania",
+    "palestina", "palestino",
+    "hamás", "hamas", "hezbolá", "hezbollah",
+    "netanyahu", "tel aviv", "jerusalén",
+)
+
+# Матчеры строим один раз при импорте — каждый фильтр дальше делает
+# один проход по тексту вместо прохода на каждое ключевое слово
+_SPAIN_MATCHER = KeywordMatcher(SPAIN_KEYWORDS)
+_STRONG_AD_MATCHER = KeywordMatcher(STRONG_AD_KEYWORDS)
+_WEAK_AD_MATCHER = KeywordMatcher(WEAK_AD_KEYWORDS)
+_ISRAEL_MATCHER = KeywordMatcher(ISRAEL_KEYWORDS)
+
+
+def is_spain_related(text_lower):
+    """Проверяет, связана ли новость с Испанией (текст уже в нижнем регистре)"""
+    if _SPAIN_MATCHER.search(text_lower):
         return True
-    
-    # Проверяем короткие аббревиатуры с границами слов
-    for abbrev in short_abbrev:
-        # \b - граница слова (word boundary)
-        if re.search(r'\b' + re.escape(abbrev) + r'\b', text_lower):
-            return True
-    
-    return False
-
-
-def is_not_advertisement(text):
-    """Проверяет, что новость не является рекламой (улучшенная версия)"""
-    text_lower = text.lower()
-    
-    # Сильные рекламные маркеры (если есть хотя бы один - точно реклама)
-    strong_ad_keywords = [
-        'comprar ahora', 'compra ahora', 'cómpralo',
-        'haz clic aquí', 'pincha aquí',
-        'solicita', 'solicitud gratuita',
-        'llama ahora', 'contacta ahora',
-        'visita nuestra tienda',
-        'añadir al carrito',
-        'pagar ahora',
-    ]
-    
-    # Слабые рекламные маркеры (нужно несколько)
-    weak_ad_keywords = [
-        'oferta', 'descuento', 'promoción', 'rebaja',
-        'precio especial', 'precio reducido',
-        'ahorra', '% de descuento', 'gratis',
-        'patrocinado', 'publicidad', 'anuncio',
-        'suscríbete', 'suscripción', 'prueba gratis',
-        'hasta agotar', 'por tiempo limitado',
-        'liquidación', 'outlet', 'chollazo',
-    ]
-    
+    # Короткие аббревиатуры — только по границам слов
+    return SHORT_ABBREV_RE.search(text_lower) is not None
+
+
+def is_not_advertisement(text_lower):
+    """Проверяет, что новость не является рекламой (текст уже в нижнем регистре)"""
     # Если есть сильный маркер - это реклама
-    if any(keyword in text_lower for keyword in strong_ad_keywords):
+    if _STRONG_AD_MATCHER.search(text_lower):
         return False
-    
-    # Считаем слабые маркеры
-    weak_count = sum(1 for keyword in weak_ad_keywords if keyword in text_lower)
-    
-    # Если больше 2 слабых маркеров - скорее всего реклама
-    return weak_count < 3
+
+    # Если больше 2 разных слабых маркеров - скорее всего реклама
+    return _WEAK_AD_MATCHER.count_distinct(text_lower) < 3
 
 
-def is_israel_related(text):
+def is_israel_related(text_lower):
     """
     Быстрый предварительный фильтр новостей об Израиле/палестино-израильском
     конфликте (испанские СМИ освещают тему с заметным перекосом — решили не
     публиковать вовсе). Это дешёвая проверка по ключевым словам ДО вызова
     Gemini — экономит токены на явных случаях. Финальное решение всё равно
     принимает AI (process_ai.py), т.к. ключевые слова не ловят все формулировки.
+    Текст ожидается уже в нижнем регистре.
     """
-    text_lower = text.lower()
-    israel_keywords = [
-        "israel", "israelí", "israelíes", "israelo",
-        "gaza", "franja de gaza", "cisjordania",
-        "palestina", "palestino",
-        "hamás", "hamas", "hezbolá", "hezbollah",
-        "netanyahu", "tel aviv", "jerusalén",
-    ]
-    return any(keyword in text_lower for keyword in israel_keywords)
+    return _ISRAEL_MATCHER.search(text_lower)
 
 
 def is_valid_news(news_item):
@@ -207,57 +302,165 @@ def is_valid_news(news_item):
     title = news_item.get('title', '')
     description = news_item.get('description', '')
 
-    # Объединяем заголовок и описание для проверки
-    full_text = f"{title} {description}"
+    # Объединяем заголовок и описание и понижаем регистр ОДИН раз —
+    # каждый фильтр дальше работает с той же строкой без новых аллокаций
+    full_text_lower = f"{title} {description}".lower()
 
     # Проверяем условия
-    spain_related = is_spain_related(full_text)
-    not_ad = is_not_advertisement(full_text)
-    not_israel = not is_israel_related(full_text)
+    spain_related = is_spain_related(full_text_lower)
+    not_ad = is_not_advertisement(full_text_lower)
+    not_israel = not is_israel_related(full_text_lower)
 
     return spain_related and not_ad and not_israel
 
 
+def _download_feed(feed_url):
+    """Скачивает RSS-фид; возвращает (url, сырые байты или None при ошибке)."""
+    print(f"🔹 Fetching: {feed_url}")
+    try:
+        resp = requests.get(
+            feed_url,
+            timeout=15,
+            headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'},
+        )
+        resp.raise_for_status()
+        return feed_url, resp.content
+    except Exception as e:
+        print(f"   ⚠️ Не удалось скачать фид {feed_url}: {e}")
+        return feed_url, None
+
+
+# XML-неймспейсы, встречающиеся в наших RSS-фидах
+_MEDIA_NS = "{http://search.yahoo.com/mrss/}"
+_CONTENT_NS = "{http://purl.org/rss/1.0/modules/content/}"
+_DC_NS = "{http://purl.org/dc/elements/1.1/}"
+
+
+def _parse_pub_date(raw):
+    """Дата публикации из строки: быстрый RFC822-парсер, затем dateutil."""
+    if not raw:
+        return None
+    try:
+        return parsedate_to_datetime(raw)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return dateparser.parse(raw)
+    except Exception:
+        return None
+
+
+def _item_image(item):
+    """Картинка RSS item — те же приоритеты полей, что в extract_image"""
+    thumb = item.find(_MEDIA_NS + "thumbnail")
+    if thumb is not None and thumb.get("url"):
+        return thumb.get("url")
+    for media in item.findall(_MEDIA_NS + "content"):
+        url = media.get("url")
+        if url and (media.get("medium") == "image" or "jpg" in url):
+            return url
+    enclosure = item.find("enclosure")
+    if enclosure is not None and enclosure.get("url"):
+        return enclosure.get("url")
+    for tag in (_CONTENT_NS + "encoded", "description"):
+        src = _first_img_src(item.findtext(tag))
+        if src:
+            return src
+    return None
+
+
+def _iter_rss_items(body):
+    """
+    Потоковый разбор RSS: iterparse отдаёт <item> по одному, из каждого
+    забираем только нужные конвейеру поля и сразу освобождаем поддерево.
+    feedparser же материализует полную модель фида (тысячи словарей на
+    больших фидах elmundo), из которой мы использовали малую часть.
+    """
+    ctx = etree.iterparse(io.BytesIO(body), events=("end",), tag="item", recover=True)
+    for _, item in ctx:
+        yield {
+            "title": (item.findtext("title") or "").strip(),
+            "link": (item.findtext("link") or "").strip(),
+            "description": (item.findtext("description") or "").strip(),
+            "published": _parse_pub_date(
+                item.findtext("pubDate") or item.findtext(_DC_NS + "date")
+            ),
+            "author": (item.findtext(_DC_NS + "creator") or item.findtext("author") or "").strip(),
+            "categories": [
+                {"term": c.text.strip()} for c in item.findall("category") if c.text
+            ],
+            "image": _item_image(item),
+        }
+        # Освобождаем разобранный элемент и всё, что перед ним
+        item.clear()
+        while item.getprevious() is not None:
+            del item.getparent()[0]
+
+
+def _feedparser_entries(body):
+    """
+    Фолбэк-разбор через feedparser для фидов, которые потоковый RSS-парсер
+    не понял (Atom, сильно поломанный XML). Приводит записи к тому же виду,
+    что _iter_rss_items.
+    """
+    for entry in feedparser.parse(body).entries:
+        # feedparser уже распарсил дату в struct_time (UTC) — гонять
+        # универсальный парсер по той же строке ещё раз не нужно
+        parsed = entry.get("published_parsed") or entry.get("updated_parsed")
+        if parsed:
+            pub_date = datetime(*parsed[:6], tzinfo=timezone.utc)
+        else:
+            pub_date = _parse_pub_date(entry.get("published") or entry.get("updated"))
+        yield {
+            "title": entry.title.strip() if hasattr(entry, "title") else "",
+            "link": entry.link if hasattr(entry, "link") else "",
+            "description": entry.get("description", "").strip(),
+            "published": pub_date,
+            "author": entry.get("author", ""),
+            "categories": entry.get("tags", []),
+            "image": extract_image(entry),
+        }
+
+
 def fetch_recent_news(max_age_hours=2):
     now = datetime.now(timezone.utc)
+    # Граница свежести считается один раз, а не по timedelta на каждую запись
+    cutoff = now - timedelta(hours=max_age_hours)
     news_items = []
 
-    for feed_url in RSS_FEEDS:
-        print(f"🔹 Fetching: {feed_url}")
-        feed = feedparser.parse(feed_url)
-
-        for entry in feed.entries:
-            # получаем дату
-            pub_date = None
-            if hasattr(entry, "published"):
-                try:
-                    pub_date = dateparser.parse(entry.published)
-                except Exception:
-                    pass
-            elif hasattr(entry, "updated"):
-                try:
-                    pub_date = dateparser.parse(entry.updated)
-                except Exception:
-                    pass
-
-            # если даты нет — пропускаем
-            if not pub_date:
-                continue
+    # Скачиваем все фиды параллельно: общее время — максимум из латентностей
+    # источников, а не их сумма. Разбор (CPU) остаётся в главном потоке,
+    # но начинается по мере готовности каждого фида (as_completed) и
+    # перекрывается с докачкой остальных.
+    with ThreadPoolExecutor(max_workers=min(8, len(RSS_FEEDS))) as pool:
+        futures = [pool.submit(_download_feed, url) for url in RSS_FEEDS]
+        downloads = (future.result() for future in as_completed(futures))
 
-            # фильтрация по времени
-            if (now - pub_date) > timedelta(hours=max_age_hours):
+        for feed_url, body in downloads:
+            if body is None:
                 continue
 
-            news = {
-                "title": entry.title.strip() if hasattr(entry, "title") else "",
-                "link": entry.link if hasattr(entry, "link") else "",
-                "description": entry.get("description", "").strip(),
-                "published": pub_date.isoformat(),
-                "author": entry.get("author", ""),
-                "categories": entry.get("tags", []),
-                "image": extract_image(entry),
-            }
-            news_items.append(news)
+            try:
+                entries = list(_iter_rss_items(body))
+            except etree.XMLSyntaxError:
+                entries = []
+            if not entries:
+                entries = _feedparser_entries(body)
+
+            for entry in entries:
+                pub_date = entry["published"]
+                # если даты нет — пропускаем
+                if not pub_date:
+                    continue
+                if pub_date.tzinfo is None:
+                    pub_date = pub_date.replace(tzinfo=timezone.utc)
+
+                # фильтрация по времени
+                if pub_date < cutoff:
+                    continue
+
+                entry["published"] = pub_date.isoformat()
+                news_items.append(entry)
 
     return news_items
 
@@ -268,21 +471,21 @@ def fetch_recent_news(max_age_hours=2):
 if __name__ == "__main__":
     # Инициализируем трекер URL
     url_tracker = URLTracker()
-    
+
     # Очищаем старые URL (старше 24 часов)
     removed_count = url_tracker.cleanup_old_urls()
     if removed_count > 0:
         print(f"🧹 Очищено {removed_count} старых URL из базы (>24ч)\n")
-    
+
     # Получаем новые новости
     news = fetch_recent_news()
     print(f"\n📰 Получено {len(news)} свежих новостей из RSS\n")
-    
+
     # Проверяем на дубликаты через URL трекер
     unique_news = []
     duplicates_count = 0
     new_urls_to_track = []
-    
+
     for news_item in news:
         url = news_item.get('link', '')
         if url and url_tracker.is_duplicate(url):
@@ -292,15 +495,15 @@ if __name__ == "__main__":
             # Сразу добавляем URL в список для отслеживания
             if url:
                 new_urls_to_track.append(url)
-    
+
     # Немедленно сохраняем URL в трекер, чтобы избежать дубликатов при параллельных запусках
     if new_urls_to_track:
         added_urls = url_tracker.add_urls_batch(new_urls_to_track)
         print(f"💾 Добавлено {added_urls} новых URL в базу отслеживания (защита от дубликатов)")
-    
+
     if duplicates_count > 0:
         print(f"🗑️  Отклонено {duplicates_count} дубликатов (URL уже обработаны)")
-    
+
     print(f"✨ Уникальных новостей: {len(unique_news)}\n")
 
     # Фильтруем новости: оставляем только про Испанию, не рекламные и не про Израиль
@@ -309,10 +512,12 @@ if __name__ == "__main__":
     rejected_reasons = {'not_spain': 0, 'advertisement': 0, 'israel_related': 0}
 
     for news_item in unique_news:
-        full_text = f"{news_item['title']} {news_item['description']}"
-        spain_related = is_spain_related(full_text)
-        not_ad = is_not_advertisement(full_text)
-        israel_related = is_israel_related(full_text)
+        # Одно понижение регистра на новость — фильтры принимают уже
+        # нормализованный текст
+        full_text_lower = f"{news_item['title']} {news_item['description']}".lower()
+        spain_related = is_spain_related(full_text_lower)
+        not_ad = is_not_advertisement(full_text_lower)
+        israel_related = is_israel_related(full_text_lower)
 
         if spain_related and not_ad and not israel_related:
             filtered_news.append(news_item)
@@ -337,7 +542,7 @@ if __name__ == "__main__":
     print(f"   🛒 Реклама: {rejected_reasons['advertisement']}")
     print(f"   🇮🇱 Про Израиль (исключено): {rejected_reasons['israel_related']}")
     print(f"✅ Прошло проверку: {len(filtered_news)} новостей\n")
-    
+
     # Выводим информацию о новостях
     for n in filtered_news:
         print(f"🧩 {n['title']}")
@@ -348,12 +553,16 @@ if __name__ == "__main__":
         print(f"   🗂️  {[tag['term'] for tag in n['categories']] if n['categories'] else []}")
         print()
 
-    # Сохраняем отфильтрованные новости (перезапись файла)
-    with open(NEWS_RAW_FILE, "w", encoding="utf-8") as f:
-        json.dump(filtered_news, f, ensure_ascii=False, indent=2)
+    # Сохраняем отфильтрованные новости (перезапись файла). indent оставляем —
+    # файл регулярно смотрят глазами при отладке конвейера
+    if orjson is not None:
+        NEWS_RAW_FILE.write_bytes(orjson.dumps(filtered_news, option=orjson.OPT_INDENT_2))
+    else:
+        with open(NEWS_RAW_FILE, "w", encoding="utf-8") as f:
+            json.dump(filtered_news, f, ensure_ascii=False, indent=2)
 
     print(f"✅ Сохранено {len(filtered_news)} новостей в {NEWS_RAW_FILE}")
-    
+
     # Финальная статистика
     stats = url_tracker.get_stats()
     print(f"📊 Всего URL в базе: {stats['total_urls']}")
\ No newline at end of file
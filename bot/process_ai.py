@@ -3,6 +3,7 @@
 
 import os
 import json
+import sqlite3
 import time
 import re
 import random
@@ -12,6 +13,53 @@ from difflib import SequenceMatcher
 from pathlib import Path
 import requests
 from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+
+# Парсер для BeautifulSoup: lxml (libxml2, C) на порядок быстрее чистопитонного
+# html.parser; при отсутствии пакета тихо откатываемся на стандартный
+try:
+    import lxml  # noqa: F401 — проверяем только наличие
+    BS_PARSER = "lxml"
+except ImportError:
+    BS_PARSER = "html.parser"
+
+# selectolax (движок Modest, C): CSS-запросы по дереву на порядок быстрее
+# питоновских обходов BeautifulSoup. Опционален — без него работает путь на BS4.
+try:
+    from selectolax.parser import HTMLParser as SelectolaxHTMLParser
+except ImportError:
+    SelectolaxHTMLParser = None
+
+# orjson (C-расширение) читает и пишет JSON-файлы конвейера в разы быстрее
+# стандартного json; без пакета — стандартный модуль, как раньше
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# rapidfuzz (C++): подтверждение похожести заголовков на порядки быстрее
+# difflib и умеет ранний выход по score_cutoff. Опционален — без него
+# SeenTitles работает на SequenceMatcher
+try:
+    from rapidfuzz import fuzz as _rf_fuzz
+except ImportError:
+    _rf_fuzz = None
+
+
+def _load_json_file(path):
+    if orjson is not None:
+        return orjson.loads(Path(path).read_bytes())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _dump_json_file(path, data):
+    # indent сохраняем — файлы конвейера регулярно читают глазами
+    if orjson is not None:
+        Path(path).write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
 
 # --- Google GenAI SDK Imports (используется только при AI_PROVIDER=gemini) ---
 from google import genai
@@ -21,9 +69,14 @@ from google.genai import types
 # Общая таксономия рубрик (bot/categories.py)
 from categories import CATEGORIES, normalize_category
 from paths import DATA_DIR
+from textsim import simhash64, hamming
 
 # Загрузка .env файла (если нужен)
 def load_env_file():
+    # Флаг в окружении: повторный импорт модуля (в том числе дочерними
+    # процессами, наследующими окружение) не перечитывает файл заново
+    if os.environ.get("_SPAINNEWS_ENV_LOADED"):
+        return
     env_path = Path(__file__).parent.parent / '.env'
     if env_path.exists():
         with open(env_path, encoding='utf-8') as f:
@@ -32,6 +85,7 @@ def load_env_file():
                 if line and not line.startswith('#') and '=' in line:
                     key, value = line.split('=', 1)
                     os.environ.setdefault(key.strip(), value.strip())
+    os.environ["_SPAINNEWS_ENV_LOADED"] = "1"
 
 load_env_file()
 
@@ -63,6 +117,9 @@ MAX_BULLET_WORDS = 18    # мягкий ориентир длины пункта
 # сводки из 2-3 буллитов ~4000 символов достаточно. Можно поднять через env.
 MAX_MODEL_INPUT_CHARS = int(os.getenv("MAX_MODEL_INPUT_CHARS", "4000"))
 MAX_ARTICLE_FETCH_CHARS = 6000  # верхняя граница парсинга статьи (с запасом над входом)
+# Сколько байт HTML максимум скачиваем со страницы: текст статьи лежит в начале
+# документа, дальше идут скрипты/медиа — их не читаем вовсе
+MAX_ARTICLE_HTML_BYTES = 200_000
 # Версия промпта — часть ключа кэша, чтобы при смене промпта старые ответы не переиспользовались.
 # v3: добавлены поля spain_focus / israel_related — старый кэш обязательно инвалидируем,
 # иначе закешированные ответы без этих полей молча обойдут новый фильтр темы.
@@ -72,10 +129,19 @@ INPUT_FILE = DATA_DIR / "news_raw.json"
 OUTPUT_FILE = DATA_DIR / "result_news.json"
 REJECTED_FILE = DATA_DIR / "rejected_news.json"
 IMAGES_DIR = DATA_DIR / "processed_images"
-CACHE_FILE = DATA_DIR / "gemini_cache.json"
+# Дисковый кэш текстов статей: перезапуск конвейера (после падения или при
+# итерациях над промптом) не перекачивает те же URL заново
+ARTICLE_CACHE_DIR = DATA_DIR / "article_cache"
+ARTICLE_CACHE_MAX_AGE_HOURS = 24
+CACHE_FILE = DATA_DIR / "gemini_cache.json"  # старый формат — только для миграции
+CACHE_DB = DATA_DIR / "gemini_cache.db"
 
 # Rate limiting / delays
 GLOBAL_DELAY = float(os.getenv("GLOBAL_DELAY", "12"))  # сек между вызовами к модели
+# Сколько статей скачивать впрок: пока текущая новость ждёт GLOBAL_DELAY и
+# ответ модели, фоновые потоки качают статьи для следующих — пауза rate limit
+# поглощает сетевое время вместо того, чтобы складываться с ним
+PREFETCH_AHEAD = 4
 BASE_RETRY_DELAY = 5  # базовая задержка для экспоненциального backoff
 MAX_RETRIES = 5
 
@@ -102,95 +168,285 @@ else:
 
 # Подготовка директорий
 os.makedirs(IMAGES_DIR, exist_ok=True)
+os.makedirs(ARTICLE_CACHE_DIR, exist_ok=True)
+
+# Дистанция SimHash-префильтра в SeenTitles; щедрая, чтобы префильтр не
+# давал ложных отрицаний — окончательное решение за SequenceMatcher
+SIMHASH_PREFILTER_DISTANCE = 24
+
+# Горячие регулярки модуля компилируются один раз — внутренний кэш re
+# всё равно делает dict-lookup на каждый вызов, а эти паттерны дёргаются
+# на каждую новость
+_WORD_RE = re.compile(r'\w+')
+_HASHTAG_RE = re.compile(r'#\w+')
+# Непарные * и _, ломающие Telegram Markdown
+_MD_STAR_RE = re.compile(r'(?<!\*)\*(?!\*)')
+_MD_UNDERSCORE_RE = re.compile(r'(?<!_)_(?!_)')
+
 
 # --- Утилиты ---
-def is_duplicate(title, seen_titles):
-    for seen in seen_titles:
-        if SequenceMatcher(None, title.lower(), seen.lower()).ratio() > DUPLICATE_THRESHOLD:
+class SeenTitles:
+    """
+    Уже встреченные заголовки с быстрой проверкой на дубликат.
+
+    Для каждого заголовка хранится 64-битная SimHash-сигнатура; проверка
+    сравнивает сигнатуры (XOR + popcount) и зовёт посимвольный
+    SequenceMatcher только для кандидатов с близкой сигнатурой — вместо
+    квадратичного ratio() по каждой паре заголовков.
+    """
+
+    @staticmethod
+    def _norm(title_lower):
+        """Нормальная форма заголовка: отсортированные токены без пунктуации."""
+        return ' '.join(sorted(_WORD_RE.findall(title_lower)))
+
+    def __init__(self, threshold=DUPLICATE_THRESHOLD):
+        self.threshold = threshold
+        self._titles = []  # уже в нижнем регистре
+        self._sigs = []
+        self._norms = set()  # нормальные формы для O(1)-отсечки точных дублей
+
+    def is_duplicate(self, title):
+        title_lower = title.lower()
+        # Точный дубль с перестановкой слов/лишними пробелами — без fuzzy вовсе
+        if self._norm(title_lower) in self._norms:
             return True
-    return False
+        sig = simhash64(title_lower)
+        cutoff = self.threshold * 100
+        sm = None
+        for seen, seen_sig in zip(self._titles, self._sigs):
+            if hamming(sig, seen_sig) > SIMHASH_PREFILTER_DISTANCE:
+                continue
+            if _rf_fuzz is not None:
+                # score_cutoff даёт ранний выход в C-коде, не доводя счёт до конца
+                if _rf_fuzz.ratio(title_lower, seen, score_cutoff=cutoff) > cutoff:
+                    return True
+                continue
+            if sm is None:
+                sm = SequenceMatcher(autojunk=False)
+                sm.set_seq2(title_lower)
+            sm.set_seq1(seen)
+            if sm.quick_ratio() > self.threshold and sm.ratio() > self.threshold:
+                return True
+        return False
+
+    def add(self, title):
+        title_lower = title.lower()
+        self._titles.append(title_lower)
+        self._sigs.append(simhash64(title_lower))
+        self._norms.add(self._norm(title_lower))
+
+# Буквенные классы для is_russian_text: подсчёт через компилированные regex
+# идёт в C-коде sre вместо посимвольного Python-цикла
+_CYRILLIC_RE = re.compile(r'[а-яёА-ЯЁ]')
+_LETTER_RE = re.compile(r'[^\W\d_]')  # любая буква Unicode
+
 
 def is_russian_text(text, threshold=RUSSIAN_TEXT_THRESHOLD):
     if not text or not text.strip():
         return False
-    russian_chars = set('абвгдеёжзийклмнопрстуфхцчшщъыьэюяАБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯ')
-    letters = [c for c in text if c.isalpha()]
-    if not letters:
+    letters_count = len(_LETTER_RE.findall(text))
+    if not letters_count:
         return False
-    russian_count = sum(1 for c in letters if c in russian_chars)
-    return (russian_count / len(letters)) >= threshold
+    russian_count = len(_CYRILLIC_RE.findall(text))
+    return (russian_count / letters_count) >= threshold
 
 def has_hashtags(text):
     if not text or not text.strip():
         return False
-    hashtags = re.findall(r'#\w+', text)
+    hashtags = _HASHTAG_RE.findall(text)
     return len(hashtags) >= 2
 
+# Длина Markdown-обёртки из is_telegram_compatible при пустых полях —
+# чтобы не собирать всю строку ради одного len()
+_TG_OVERHEAD = len("📰 **\n\n\n\n🔗 [Ссылка на источник]()")
+
+
 def is_telegram_compatible(title, description, link):
-    formatted_text = f"📰 *{title}*\n\n{description}\n\n🔗 [Ссылка на источник]({link})"
-    return len(formatted_text) <= MAX_TELEGRAM_LENGTH
+    return len(title) + len(description) + len(link) + _TG_OVERHEAD <= MAX_TELEGRAM_LENGTH
+
+# Общая HTTP-сессия: keep-alive переиспользует TCP/TLS-соединения к одним и
+# тем же хостам (elpais.com, elmundo.es, openrouter.ai) вместо нового
+# рукопожатия на каждый запрос. Пул расширен под фоновый префетч статей.
+SESSION = requests.Session()
+SESSION.headers.update({'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'})
+SESSION.mount('https://', requests.adapters.HTTPAdapter(pool_connections=8, pool_maxsize=16))
+
+# Мусорные теги, которые выкидываем перед извлечением текста статьи
+_STRIP_TAGS = ['script', 'style', 'nav', 'header', 'footer', 'aside', 'iframe']
+
+
+def _extract_text_selectolax(html):
+    """Извлечение текста статьи через selectolax: CSS-запросы в C-коде."""
+    tree = SelectolaxHTMLParser(html)
+    tree.strip_tags(_STRIP_TAGS)
+
+    def _join(nodes):
+        return ' '.join(t for t in (n.text(strip=True) for n in nodes) if t)
+
+    article_text = _join(tree.css('article p'))
+    if not article_text:
+        article_text = _join(tree.css(
+            '[class*="article"] p, [class*="content"] p, [class*="story"] p, [class*="post"] p'))
+    if not article_text or len(article_text) < 200:
+        article_text = _join(tree.css('p'))
+    return article_text
+
+
+def _extract_text_bs4(html):
+    """Фолбэк-извлечение через BeautifulSoup (если selectolax не установлен)."""
+    soup = BeautifulSoup(html, BS_PARSER)
+    for el in soup(_STRIP_TAGS):
+        el.decompose()
+    article_text = ""
+    article = soup.find('article')
+    if article:
+        ps = article.find_all('p')
+        article_text = ' '.join([p.get_text().strip() for p in ps if p.get_text().strip()])
+    if not article_text:
+        content_divs = soup.find_all(['div'], class_=lambda x: x and any(word in str(x).lower() for word in ['article','content','story','post']))
+        for div in content_divs:
+            ps = div.find_all('p')
+            t = ' '.join([p.get_text().strip() for p in ps if p.get_text().strip()])
+            if len(t) > len(article_text):
+                article_text = t
+    if not article_text or len(article_text) < 200:
+        ps = soup.find_all('p')
+        article_text = ' '.join([p.get_text().strip() for p in ps if p.get_text().strip()])
+    return article_text
+
+
+def _prune_article_cache(max_age_hours=ARTICLE_CACHE_MAX_AGE_HOURS):
+    """Удаляет из дискового кэша статьи старше max_age_hours."""
+    cutoff = time.time() - max_age_hours * 3600
+    removed = 0
+    for p in ARTICLE_CACHE_DIR.glob("*.txt"):
+        try:
+            if p.stat().st_mtime < cutoff:
+                p.unlink()
+                removed += 1
+        except OSError:
+            continue
+    if removed:
+        print(f"🧹 Очищено {removed} устаревших статей из дискового кэша")
+
 
 def fetch_article_content(url):
+    cache_path = ARTICLE_CACHE_DIR / (hashlib.sha256(url.encode("utf-8")).hexdigest() + ".txt")
+    try:
+        if cache_path.exists():
+            return cache_path.read_text(encoding="utf-8")
+    except OSError:
+        pass
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'
-        }
-        resp = requests.get(url, headers=headers, timeout=10)
+        # Два захода: короткий таймаут ловит здоровый сайт быстро, повтор с
+        # щедрым таймаутом и джиттером добирает медленные/мигающие CDN
+        resp = None
+        for attempt, timeout in enumerate((5, 10)):
+            try:
+                resp = SESSION.get(url, timeout=timeout, stream=True)
+                break
+            except (requests.Timeout, requests.ConnectionError) as e:
+                if attempt == 1:
+                    raise
+                print(f"   🔁 Повтор загрузки статьи ({type(e).__name__})")
+                time.sleep(1 + random.uniform(0, 1))
         resp.raise_for_status()
-        soup = BeautifulSoup(resp.content, 'html.parser')
-        for el in soup(['script', 'style', 'nav', 'header', 'footer', 'aside', 'iframe']):
-            el.decompose()
-        article_text = ""
-        article = soup.find('article')
-        if article:
-            ps = article.find_all('p')
-            article_text = ' '.join([p.get_text().strip() for p in ps if p.get_text().strip()])
-        if not article_text:
-            content_divs = soup.find_all(['div'], class_=lambda x: x and any(word in str(x).lower() for word in ['article','content','story','post']))
-            for div in content_divs:
-                ps = div.find_all('p')
-                t = ' '.join([p.get_text().strip() for p in ps if p.get_text().strip()])
-                if len(t) > len(article_text):
-                    article_text = t
-        if not article_text or len(article_text) < 200:
-            ps = soup.find_all('p')
-            article_text = ' '.join([p.get_text().strip() for p in ps if p.get_text().strip()])
-        return article_text[:MAX_ARTICLE_FETCH_CHARS] if article_text else ""
+        # Читаем потоково и обрываем после MAX_ARTICLE_HTML_BYTES: раздутые
+        # страницы (инлайн-JSON, трекеры) не тянем целиком
+        chunks = []
+        received = 0
+        for chunk in resp.iter_content(8192):
+            chunks.append(chunk)
+            received += len(chunk)
+            if received >= MAX_ARTICLE_HTML_BYTES:
+                break
+        resp.close()
+        html = b''.join(chunks)
+        if SelectolaxHTMLParser is not None:
+            article_text = _extract_text_selectolax(html)
+        else:
+            article_text = _extract_text_bs4(html)
+        article_text = article_text[:MAX_ARTICLE_FETCH_CHARS] if article_text else ""
+        if article_text:
+            try:
+                cache_path.write_text(article_text, encoding="utf-8")
+            except OSError:
+                pass
+        return article_text
     except Exception as e:
         print(f"   ⚠️ Ошибка загрузки статьи: {e}")
         return ""
 
+# Вводные фразы, которые модель иногда ставит перед ответом, — один
+# якорный regex вместо цепочки startswith; кавычки снимаются вторым
+_LEAD_PHRASES = [
+    "Вот краткая выжимка:", "Краткая выжимка:", "Вот краткое изложение:", "Краткое изложение:",
+    "Вот перевод:", "Перевод:", "Вот заголовок:", "Заголовок:", "Вот пересказ:", "Пересказ:",
+    "Вот новость:", "Новость:"
+]
+_LEAD_RE = re.compile(r'^(?:' + '|'.join(map(re.escape, _LEAD_PHRASES)) + r')\s*')
+_QUOTED_RE = re.compile(r'^"(.*)"$|^\'(.*)\'$', re.S)
+
+
 def clean_ai_response(text):
-    phrases_to_remove = [
-        "Вот краткая выжимка:", "Краткая выжимка:", "Вот краткое изложение:", "Краткое изложение:",
-        "Вот перевод:", "Перевод:", "Вот заголовок:", "Заголовок:", "Вот пересказ:", "Пересказ:",
-        "Вот новость:", "Новость:"
-    ]
-    result = text.strip()
-    for p in phrases_to_remove:
-        if result.startswith(p):
-            result = result[len(p):].strip()
-    if (result.startswith('"') and result.endswith('"')) or (result.startswith("'") and result.endswith("'")):
-        result = result[1:-1].strip()
+    result = _LEAD_RE.sub('', text.strip())
+    m = _QUOTED_RE.match(result)
+    if m:
+        result = (m.group(1) if m.group(1) is not None else m.group(2)).strip()
     return result
 
-# --- Кэш для ответов модели ---
-def load_cache():
+# --- Кэш для ответов модели (SQLite: O(1) вставка вместо полной перезаписи
+# JSON-файла на каждый новый ответ) ---
+_cache_conn = None
+
+
+def _migrate_json_cache(conn):
+    """Одноразовый перенос старого gemini_cache.json в SQLite."""
+    if not Path(CACHE_FILE).exists():
+        return
+    try:
+        with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            conn.executemany(
+                "INSERT OR IGNORE INTO cache(key, value) VALUES(?, ?)",
+                [(k, json.dumps(v, ensure_ascii=False)) for k, v in data.items()],
+            )
+            conn.commit()
+            print(f"   ♻️ Кэш мигрирован в SQLite: {len(data)} записей")
+        Path(CACHE_FILE).rename(str(CACHE_FILE) + ".migrated")
+    except Exception as e:
+        print(f"   ⚠️ Не удалось мигрировать старый кэш: {e}")
+
+
+def _get_cache_conn():
+    global _cache_conn
+    if _cache_conn is None:
+        _cache_conn = sqlite3.connect(CACHE_DB)
+        _cache_conn.execute("CREATE TABLE IF NOT EXISTS cache(key TEXT PRIMARY KEY, value TEXT)")
+        _migrate_json_cache(_cache_conn)
+    return _cache_conn
+
+
+def cache_get(key):
+    """Возвращает закешированный ответ модели или None."""
     try:
-        if Path(CACHE_FILE).exists():
-            with open(CACHE_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                if isinstance(data, dict):
-                    return data
-                print(f"   ⚠️ Кэш файл повреждён, создаём новый")
+        row = _get_cache_conn().execute("SELECT value FROM cache WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
     except Exception as e:
         print(f"   ⚠️ Ошибка чтения кэша: {e}")
-    return {}
+        return None
 
-def save_cache(cache):
+
+def cache_put(key, value):
     try:
-        with open(CACHE_FILE, 'w', encoding='utf-8') as f:
-            json.dump(cache, f, ensure_ascii=False, indent=2)
+        conn = _get_cache_conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache(key, value) VALUES(?, ?)",
+            (key, json.dumps(value, ensure_ascii=False)),
+        )
+        conn.commit()
     except Exception as e:
         print(f"   ⚠️ Не удалось сохранить кэш: {e}")
 
@@ -203,7 +459,7 @@ OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
 def call_ai_model(model, prompt):
     """Делает один запрос к модели выбранного провайдера, возвращает текст ответа."""
     if AI_PROVIDER == "openrouter":
-        resp = requests.post(
+        resp = SESSION.post(
             OPENROUTER_URL,
             headers={
                 "Authorization": f"Bearer {API_KEY}",
@@ -231,7 +487,22 @@ def call_ai_model(model, prompt):
             config=types.GenerateContentConfig(
                 temperature=0.4,
                 max_output_tokens=800,
-                response_mime_type="application/json"
+                response_mime_type="application/json",
+                # Схема ответа: модель конструируется под неё и перестаёт
+                # возвращать JSON в markdown-обёртке или с лишними полями
+                response_schema={
+                    "type": "object",
+                    "properties": {
+                        "title_ru": {"type": "string"},
+                        "bullets": {"type": "array", "items": {"type": "string"}},
+                        "importance": {"type": "integer"},
+                        "category": {"type": "string"},
+                        "hashtags": {"type": "array", "items": {"type": "string"}},
+                        "spain_focus": {"type": "boolean"},
+                        "israel_related": {"type": "boolean"},
+                    },
+                    "required": ["title_ru", "bullets", "importance", "category", "hashtags"],
+                },
             )
         )
         if hasattr(response, "text") and response.text:
@@ -298,6 +569,23 @@ def _coerce_bool(value, default):
     return default
 
 
+# Момент последнего реального вызова модели (monotonic). Пауза GLOBAL_DELAY
+# выдерживается от него, а не вставляется фиксированно перед каждой новостью:
+# кэш-хиты не ждут вовсе, а скачивание статьи и прочая работа между вызовами
+# засчитываются в счёт паузы.
+_last_model_call = float("-inf")
+
+
+def _respect_global_delay():
+    """Досыпает остаток GLOBAL_DELAY с момента прошлого вызова модели."""
+    global _last_model_call
+    wait = GLOBAL_DELAY - (time.monotonic() - _last_model_call)
+    if wait > 0:
+        print(f"   💤 Ждём {wait:.1f}s перед запросом к {AI_PROVIDER} (глобальный rate limit)")
+        time.sleep(wait)
+    _last_model_call = time.monotonic()
+
+
 def gemini_request_single_json(article_text, max_retries=MAX_RETRIES, base_delay=BASE_RETRY_DELAY):
     """
     Делает один (логический) запрос к Gemini, который должен вернуть JSON:
@@ -331,13 +619,13 @@ def gemini_request_single_json(article_text, max_retries=MAX_RETRIES, base_delay
         "Текст статьи:\n\n" + article_text
     )
 
-    cache = load_cache()
     # Стабильный ключ по содержимому статьи (+версия промпта) — работает между запусками,
     # в отличие от рандомизированного hash(). Экономит повторные вызовы для тех же новостей.
     cache_key = hashlib.sha256((PROMPT_VERSION + "\n" + article_text).encode("utf-8")).hexdigest()
-    if cache_key in cache:
+    cached = cache_get(cache_key)
+    if cached is not None:
         # Возвращаем закешированный ответ
-        return cache[cache_key]
+        return cached
 
     last_error = None
     for attempt in range(max_retries):
@@ -345,6 +633,8 @@ def gemini_request_single_json(article_text, max_retries=MAX_RETRIES, base_delay
         try:
             if attempt > 0:
                 print(f"   🔁 Retry {attempt}/{max_retries}, trying model={model}")
+            # Пауза считается только перед реальными вызовами (кэш-хиты вышли раньше)
+            _respect_global_delay()
             # Генерация
             text = call_ai_model(model, prompt)
 
@@ -363,7 +653,7 @@ def gemini_request_single_json(article_text, max_retries=MAX_RETRIES, base_delay
             bullets = _coerce_bullets(parsed.get("bullets"))
             hashtags = parsed.get("hashtags", [])
             if isinstance(hashtags, str):
-                hashtags = re.findall(r'#\w+', hashtags)
+                hashtags = _HASHTAG_RE.findall(hashtags)
             importance = _coerce_importance(parsed.get("importance"))
             category = normalize_category(parsed.get("category"))
             # Дефолты выбраны в сторону базовой частоты: большинство статей после
@@ -386,8 +676,7 @@ def gemini_request_single_json(article_text, max_retries=MAX_RETRIES, base_delay
                 "spain_focus": spain_focus,
                 "israel_related": israel_related,
             }
-            cache[cache_key] = result
-            save_cache(cache)
+            cache_put(cache_key, result)
             return result
 
         except Exception as e:
@@ -434,8 +723,9 @@ def main():
         print(f"❌ Файл {INPUT_FILE} не найден.")
         return
 
-    with open(input_path, 'r', encoding='utf-8') as f:
-        news_items = json.load(f)
+    _prune_article_cache()
+
+    news_items = _load_json_file(input_path)
 
     if not news_items or not isinstance(news_items, list):
         print(f"❌ Файл {INPUT_FILE} пуст или имеет неверный формат.")
@@ -445,10 +735,61 @@ def main():
 
     processed_news = []
     rejected_news = []
-    seen_titles = []  # исходные заголовки из RSS
-    seen_processed_titles = []  # переписанные AI заголовки (кэш ответов ведётся внутри gemini_request_single_json)
+
+    # Частичный результат: каждая готовая новость сразу дописывается строкой
+    # в result_news.jsonl — при падении посреди прогона оплаченная работа
+    # модели остаётся на диске, а не только в памяти процесса
+    partial_path = output_path.with_suffix(".jsonl")
+    seen_titles = SeenTitles()  # исходные заголовки из RSS
+    seen_processed_titles = SeenTitles()  # переписанные AI заголовки (кэш ответов ведётся внутри gemini_request_single_json)
+
+    # Если от упавшего прогона остался .jsonl — подхватываем готовые записи,
+    # чтобы перезапуск не переделывал уже оплаченную работу модели.
+    # Битые строки (например, оборванная последняя при падении посреди
+    # записи) молча пропускаются.
+    resumed_links = set()
+    if partial_path.exists():
+        try:
+            with open(partial_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        item = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    processed_news.append(item)
+                    seen_processed_titles.add(item.get("title", ""))
+                    if item.get("link"):
+                        resumed_links.add(item["link"])
+        except OSError as e:
+            print(f"⚠️ Не удалось прочитать {partial_path.name}: {e}")
+        if processed_news:
+            print(f"♻️ Подхвачено {len(processed_news)} готовых новостей из прерванного прогона")
+
+    # Файл переписывается с нуля: подхваченные записи идут первыми строками,
+    # так что оборванный хвост прошлого прогона не остаётся в середине
+    partial_file = open(partial_path, "w", encoding="utf-8")
+    for item in processed_news:
+        partial_file.write(json.dumps(item, ensure_ascii=False) + "\n")
+    partial_file.flush()
+
+    # Префетч статей: очередь из PREFETCH_AHEAD фоновых загрузок. Вызовы
+    # модели остаются строго последовательными (общий rate limit), кэш
+    # модели трогает только главный поток — блокировки не нужны.
+    prefetch_pool = ThreadPoolExecutor(max_workers=PREFETCH_AHEAD)
+    article_futures = {}
+
+    def _prefetch(index):
+        if index < len(news_items):
+            prefetch_link = news_items[index].get("link", "").strip()
+            if prefetch_link:
+                article_futures[index] = prefetch_pool.submit(fetch_article_content, prefetch_link)
+
+    for i in range(PREFETCH_AHEAD):
+        _prefetch(i)
 
     for idx, news in enumerate(news_items, start=1):
+        # Пополняем очередь префетча на PREFETCH_AHEAD вперёд от текущей
+        _prefetch(idx - 1 + PREFETCH_AHEAD)
         try:
             title = news.get("title", "").strip()
             description = news.get("description", "").strip()
@@ -458,17 +799,29 @@ def main():
             print(f"[{idx}/{len(news_items)}] {title[:80]}")
             print(f"{'='*70}")
 
-            if is_duplicate(title, seen_titles):
+            if link and link in resumed_links:
+                print("   ♻️ Уже обработана в прерванном прогоне, пропускаем")
+                stale = article_futures.pop(idx - 1, None)
+                if stale is not None:
+                    stale.cancel()
+                continue
+
+            if seen_titles.is_duplicate(title):
                 print("   ⚠️ Дубликат, пропускаем")
                 rejected_news.append({"title": title, "reason": "duplicate"})
+                # Статья этой новости больше не нужна — снимаем загрузку, если не началась
+                stale = article_futures.pop(idx - 1, None)
+                if stale is not None:
+                    stale.cancel()
                 continue
-            seen_titles.append(title)
+            seen_titles.add(title)
 
             # Подготовка текста для модели (сначала пытаемся полную статью)
             article_content = ""
             if link:
                 print("   🔗 Загружаем статью...")
-                article_content = fetch_article_content(link)
+                future = article_futures.pop(idx - 1, None)
+                article_content = future.result() if future is not None else fetch_article_content(link)
                 if article_content:
                     print(f"   📄 Загружено {len(article_content)} символов")
                 else:
@@ -476,10 +829,6 @@ def main():
 
             text_for_model = (title + ". " + (article_content or description or title))[:MAX_MODEL_INPUT_CHARS]
 
-            # Минимальная задержка между вызовами к модели
-            print(f"   💤 Ждём {GLOBAL_DELAY}s перед запросом к {AI_PROVIDER} (глобальный rate limit)")
-            time.sleep(GLOBAL_DELAY)
-
             print(f"   🤖 Отправляем запрос к {AI_PROVIDER}...")
             try:
                 ai_result = gemini_request_single_json(text_for_model)
@@ -513,8 +862,8 @@ def main():
             def _clean_md(s):
                 """Убирает символы, ломающие Telegram Markdown (backtick, непарные * и _)."""
                 s = s.replace('`', '')
-                s = re.sub(r'(?<!\*)\*(?!\*)', '', s)
-                s = re.sub(r'(?<!_)_(?!_)', '', s)
+                s = _MD_STAR_RE.sub('', s)
+                s = _MD_UNDERSCORE_RE.sub('', s)
                 return s.strip()
 
             rewritten_title = _clean_md(rewritten_title)
@@ -548,11 +897,11 @@ def main():
                 rejected_news.append({"title": title, "reason": "few_hashtags"})
                 continue
             # Проверка на дубликат среди переписанных заголовков (одно событие из разных источников)
-            if is_duplicate(rewritten_title, seen_processed_titles):
+            if seen_processed_titles.is_duplicate(rewritten_title):
                 print(f"   ⚠️ Дубликат переписанного заголовка (одно событие из разных источников), пропускаем")
                 rejected_news.append({"title": title, "reason": "duplicate_processed"})
                 continue
-            seen_processed_titles.append(rewritten_title)
+            seen_processed_titles.add(rewritten_title)
 
             # description — плоский текст из буллитов (для трекера дублей и обратной совместимости)
             description = "\n".join(f"• {b}" for b in bullets)
@@ -564,7 +913,7 @@ def main():
 
             print(f"   ✅ ОК: {rewritten_title[:60]} / {len(bullets)} пунктов / importance {importance} / {category} / tags {len(hashtags)}")
 
-            processed_news.append({
+            processed_item = {
                 "title": rewritten_title,
                 "bullets": bullets,
                 "importance": importance,
@@ -577,7 +926,10 @@ def main():
                 "categories": news.get("categories", []),
                 "image": news.get("image"),
                 "processed_at": time.time()  # Временная метка обработки
-            })
+            }
+            processed_news.append(processed_item)
+            partial_file.write(json.dumps(processed_item, ensure_ascii=False) + "\n")
+            partial_file.flush()
             
         except Exception as e:
             print(f"\n   💥 КРИТИЧЕСКАЯ ОШИБКА при обработке новости [{idx}/{len(news_items)}]")
@@ -587,15 +939,23 @@ def main():
             rejected_news.append({"title": news.get("title", "Unknown"), "reason": f"processing_error: {str(e)}"})
             continue
 
+    # Недокачанные статьи уже никому не нужны
+    prefetch_pool.shutdown(wait=False, cancel_futures=True)
+
     # Сохраняем результат
     print(f"\n💾 Сохранение {len(processed_news)} обработанных новостей в {OUTPUT_FILE}...")
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(processed_news, f, ensure_ascii=False, indent=2)
-    
+    _dump_json_file(output_path, processed_news)
+
+    # Итоговый файл записан — страховочный .jsonl больше не нужен
+    partial_file.close()
+    try:
+        partial_path.unlink()
+    except OSError:
+        pass
+
     # Сохраняем отклоненные
     print(f"💾 Сохранение {len(rejected_news)} отклоненных новостей в {REJECTED_FILE}...")
-    with open(rejected_path, 'w', encoding='utf-8') as f:
-        json.dump(rejected_news, f, ensure_ascii=False, indent=2)
+    _dump_json_file(rejected_path, rejected_news)
 
     print("✅ Готово.")
 
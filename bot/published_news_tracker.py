@@ -1,45 +1,122 @@
 """
 Модуль для отслеживания опубликованных новостей и предотвращения дубликатов
 """
+import bisect
 import json
+import os
+import time
 from datetime import datetime, timedelta
 from difflib import SequenceMatcher
 
 from bot.paths import DATA_DIR
+from bot.textsim import simhash64, hamming
+
+# rapidfuzz (опционально): C++-реализация схожести строк, на порядок
+# быстрее difflib; без неё работает стандартный SequenceMatcher
+try:
+    from rapidfuzz import fuzz as _rf_fuzz
+except ImportError:
+    _rf_fuzz = None
+
+# orjson (опционально): заметно быстрее стандартного json на истории
+# в сотни записей; без него работает стандартный модуль
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 PUBLISHED_NEWS_FILE = DATA_DIR / "published_news.json"
 HISTORY_DAYS = 14  # Хранить историю за последние 14 дней
 
+# Дистанция SimHash-префильтра намеренно щедрая: префильтр обязан не давать
+# ложных ОТРИЦАНИЙ (пропущенный дубль хуже лишнего точного сравнения),
+# окончательное решение всегда за SequenceMatcher.
+SIMHASH_PREFILTER_DISTANCE = 24
+
+
+def _simhash_far(sig_a, sig_b) -> bool:
+    """True, если сигнатуры заведомо слишком далеки, чтобы быть дублями."""
+    return hamming(sig_a, sig_b) > SIMHASH_PREFILTER_DISTANCE
+
 
-def similarity(text1: str, text2: str) -> float:
+def similarity(text1: str, text2: str, threshold: float = 0.0) -> float:
     """
-    Вычисляет схожесть двух текстов (от 0.0 до 1.0)
+    Вычисляет схожесть двух текстов (от 0.0 до 1.0).
+
+    threshold — необязательная нижняя граница интересующей схожести:
+    если даже верхняя оценка ratio() её не достигает, дорогой полный
+    расчёт не запускается и возвращается 0.0. SequenceMatcher сам не
+    делает short-circuit даже на идентичных строках — проверяем явно.
     """
-    return SequenceMatcher(None, text1.lower(), text2.lower()).ratio()
+    a = text1.lower()
+    b = text2.lower()
+    if a == b:
+        return 1.0
+    # ratio() не превышает 2*min(len)/(len_a+len_b)
+    if threshold and 2 * min(len(a), len(b)) < threshold * (len(a) + len(b)):
+        return 0.0
+    sm = SequenceMatcher(None, a, b)
+    if threshold and sm.quick_ratio() < threshold:
+        return 0.0
+    return sm.ratio()
+
+
+# Кэш распарсенной истории на процесс: publish_digest/publish_news зовут
+# check_duplicate для каждой новости пачки, и каждая проверка раньше заново
+# читала и декодировала весь JSON. Валидность кэша подтверждается по mtime
+# файла — запись из другого процесса приводит к перечитыванию.
+_news_cache: list | None = None
+_news_cache_mtime: int | None = None
+
+
+def _file_mtime() -> int | None:
+    """st_mtime_ns файла истории (None, если файла нет)"""
+    try:
+        return os.stat(PUBLISHED_NEWS_FILE).st_mtime_ns
+    except OSError:
+        return None
 
 
 def load_published_news() -> list:
     """
-    Загружает историю опубликованных новостей
+    Загружает историю опубликованных новостей (с диска — только если файл
+    изменился с прошлой загрузки)
     """
+    global _news_cache, _news_cache_mtime
+
     if not PUBLISHED_NEWS_FILE.exists():
         return []
-    
+
+    mtime = _file_mtime()
+    if _news_cache is not None and mtime == _news_cache_mtime:
+        return _news_cache
+
     try:
-        with open(PUBLISHED_NEWS_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        if orjson is not None:
+            _news_cache = orjson.loads(PUBLISHED_NEWS_FILE.read_bytes())
+        else:
+            with open(PUBLISHED_NEWS_FILE, 'r', encoding='utf-8') as f:
+                _news_cache = json.load(f)
     except Exception as e:
         print(f"Ошибка при загрузке published_news.json: {e}")
         return []
+    _news_cache_mtime = mtime
+    return _news_cache
 
 
 def save_published_news(news_list: list):
     """
     Сохраняет историю опубликованных новостей
     """
+    global _news_cache, _news_cache_mtime
     try:
-        with open(PUBLISHED_NEWS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(news_list, f, ensure_ascii=False, indent=2)
+        if orjson is not None:
+            PUBLISHED_NEWS_FILE.write_bytes(orjson.dumps(news_list, option=orjson.OPT_INDENT_2))
+        else:
+            with open(PUBLISHED_NEWS_FILE, 'w', encoding='utf-8') as f:
+                json.dump(news_list, f, ensure_ascii=False, indent=2)
+        _news_cache = news_list
+        _news_cache_mtime = _file_mtime()
     except Exception as e:
         print(f"Ошибка при сохранении published_news.json: {e}")
 
@@ -55,16 +132,31 @@ def cleanup_old_entries(news_list: list) -> list:
         Отфильтрованный список
     """
     cutoff_date = datetime.now() - timedelta(days=HISTORY_DAYS)
-    
-    filtered = []
-    for news in news_list:
-        try:
-            published_at = datetime.fromisoformat(news.get('published_at', ''))
-            if published_at >= cutoff_date:
-                filtered.append(news)
-        except (ValueError, TypeError):
-            # Если дата невалидна, пропускаем запись
-            continue
+    cutoff_ts = time.time() - HISTORY_DAYS * 86400
+
+    # Записи добавляются хронологически, так что очистка — отсечение
+    # префикса. Когда у всех записей есть epoch-метка, граница находится
+    # бинарным поиском и устаревший префикс срезается одним слайсом.
+    if news_list and all('published_at_ts' in n for n in news_list):
+        idx = bisect.bisect_left(news_list, cutoff_ts, key=lambda n: n['published_at_ts'])
+        filtered = news_list[idx:]
+    else:
+        filtered = []
+        for news in news_list:
+            # Быстрый путь: у новых записей есть epoch-метка — сравнение
+            # двух чисел вместо разбора ISO-строки на каждую запись
+            ts = news.get('published_at_ts')
+            if ts is not None:
+                if ts >= cutoff_ts:
+                    filtered.append(news)
+                continue
+            try:
+                published_at = datetime.fromisoformat(news.get('published_at', ''))
+                if published_at >= cutoff_date:
+                    filtered.append(news)
+            except (ValueError, TypeError):
+                # Если дата невалидна, пропускаем запись
+                continue
     
     removed_count = len(news_list) - len(filtered)
     if removed_count > 0:
@@ -92,7 +184,17 @@ def add_published_news(title: str, text: str, url: str = ""):
         "title": title,
         "text": text,
         "url": url,
-        "published_at": datetime.now().isoformat()
+        "published_at": datetime.now().isoformat(),
+        # Epoch-метка для быстрой очистки (ISO-строка остаётся для людей
+        # и обратной совместимости)
+        "published_at_ts": int(time.time()),
+        # Сигнатуры для быстрого префильтра в check_duplicate
+        "sig_title": simhash64(title),
+        "sig_text": simhash64(text),
+        # Нижний регистр считается один раз при записи: иначе каждый
+        # check_duplicate лоуэркейсит одни и те же строки по всей истории
+        "title_lc": title.lower(),
+        "text_lc": text.lower(),
     }
     
     news_list.append(news_entry)
@@ -116,20 +218,69 @@ def check_duplicate(title: str, text: str, similarity_threshold: float = 0.85) -
         - similarity_score: float схожесть с найденным дубликатом
     """
     news_list = load_published_news()
-    
+
     # Очищаем старые записи
     news_list = cleanup_old_entries(news_list)
-    
+
+    title_lower = (title or "").lower()
+    text_lower = (text or "").lower()
+
+    # Два матчера на весь проход по истории: set_seq2 кэширует внутренний
+    # индекс (b2j) проверяемой строки один раз, дальше на каждую запись
+    # меняется только seq1 — difflib не пересобирает индекс n раз.
+    # quick_ratio — дешёвая верхняя оценка ratio: почти все непохожие
+    # записи отсеиваются без полного Ratcliff-Obershelp.
+    sm_title = SequenceMatcher(autojunk=False)
+    sm_title.set_seq2(title_lower)
+    sm_text = SequenceMatcher(autojunk=False)
+    sm_text.set_seq2(text_lower)
+
+    def _sim(sm, query, candidate):
+        if candidate == query:
+            return 1.0
+        # ratio() не превышает 2*min(len)/(len_a+len_b): если даже эта
+        # верхняя граница ниже порога — сравнивать бессмысленно
+        if 2 * min(len(query), len(candidate)) < similarity_threshold * (len(query) + len(candidate)):
+            return 0.0
+        if _rf_fuzz is not None:
+            # score_cutoff даёт ранний выход в C-коде: на непохожих парах
+            # счёт бросается, как только верхняя граница падает ниже порога
+            return _rf_fuzz.ratio(query, candidate, score_cutoff=similarity_threshold * 100) / 100.0
+        sm.set_seq1(candidate)
+        if sm.quick_ratio() < similarity_threshold:
+            return 0.0
+        return sm.ratio()
+
+    query_sig_title = simhash64(title_lower)
+    query_sig_text = simhash64(text_lower)
+
     for published_news in news_list:
-        # Сравниваем заголовки
-        title_sim = similarity(title, published_news.get('title', ''))
-        
+        # SimHash-префильтр: если обе сигнатуры далеки от проверяемой
+        # новости, точное сравнение не нужно вовсе. Старые записи без
+        # сигнатур проходят на полную проверку как раньше.
+        sig_title = published_news.get('sig_title')
+        sig_text = published_news.get('sig_text')
+        if (sig_title is not None and sig_text is not None
+                and _simhash_far(query_sig_title, sig_title)
+                and _simhash_far(query_sig_text, sig_text)):
+            continue
+
+        # Сравниваем заголовки (у старых записей нет предвычисленного
+        # нижнего регистра — лоуэркейсим на месте)
+        cand_title = published_news.get('title_lc')
+        if cand_title is None:
+            cand_title = published_news.get('title', '').lower()
+        title_sim = _sim(sm_title, title_lower, cand_title)
+
         # Сравниваем тексты
-        text_sim = similarity(text, published_news.get('text', ''))
-        
+        cand_text = published_news.get('text_lc')
+        if cand_text is None:
+            cand_text = published_news.get('text', '').lower()
+        text_sim = _sim(sm_text, text_lower, cand_text)
+
         # Берём максимальную схожесть
         max_sim = max(title_sim, text_sim)
-        
+
         if max_sim >= similarity_threshold:
             return {
                 "is_duplicate": True,
@@ -0,0 +1,50 @@
+"""
+Token-bucket лимитер отправки сообщений в Telegram.
+
+Telegram ограничивает ботов: ~30 сообщений/сек суммарно и ~1 сообщение/сек
+в один чат. Без лимитера всплеск авто-постинга упирается в 429 Too Many
+Requests, и встроенные ретраи PTB сериализуют всё с большими паузами.
+Дешевле не превышать бюджет заранее: перед каждой отправкой берём токен
+из глобального ведра и из ведра конкретного чата — спим только когда
+бюджет действительно исчерпан (одиночные клики админа проходят без пауз).
+"""
+import asyncio
+import time
+from collections import defaultdict
+
+# Лимиты Telegram Bot API (с небольшим запасом)
+GLOBAL_RATE = 28      # сообщений/сек на бота суммарно
+PER_CHAT_RATE = 1     # сообщений/сек в один чат
+
+
+class TokenBucket:
+    """Классическое token bucket: пополняется со скоростью rate токенов/сек."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Ждёт (если нужно) и забирает один токен."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self.tokens) / self.rate)
+
+
+_GLOBAL_BUCKET = TokenBucket(rate=GLOBAL_RATE, capacity=GLOBAL_RATE)
+_CHAT_BUCKETS = defaultdict(lambda: TokenBucket(rate=PER_CHAT_RATE, capacity=PER_CHAT_RATE))
+
+
+async def acquire_send_slot(chat_id) -> None:
+    """Берёт слот на отправку сообщения в chat_id (глобальный + чатовый бюджет)."""
+    await _GLOBAL_BUCKET.acquire()
+    await _CHAT_BUCKETS[chat_id].acquire()
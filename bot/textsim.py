@@ -0,0 +1,44 @@
+"""
+Лёгкие сигнатуры текстов для быстрых проверок на дубликаты.
+
+Модуль намеренно без зависимостей от остального кода: скрипты конвейера
+(fetch_news.py, process_ai.py) запускаются из bot/ и импортируют его как
+`textsim`, код бота — как `bot.textsim`.
+"""
+from hashlib import blake2b
+
+SIMHASH_NGRAM = 5
+
+
+def simhash64(text: str) -> int:
+    """
+    64-битная SimHash-сигнатура текста по символьным 5-граммам.
+
+    Похожие тексты дают сигнатуры с малой дистанцией Хэмминга, поэтому
+    сравнение пары сводится к XOR и подсчёту битов вместо посимвольного
+    diff-а. Считается один раз на текст и переиспользуется.
+    """
+    text = (text or "").lower()
+    grams = (
+        [text[i:i + SIMHASH_NGRAM] for i in range(len(text) - SIMHASH_NGRAM + 1)]
+        if len(text) >= SIMHASH_NGRAM else ([text] if text else [])
+    )
+    if not grams:
+        return 0
+
+    counts = [0] * 64
+    for gram in grams:
+        h = int.from_bytes(blake2b(gram.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(64):
+            counts[bit] += 1 if (h >> bit) & 1 else -1
+
+    sig = 0
+    for bit in range(64):
+        if counts[bit] > 0:
+            sig |= 1 << bit
+    return sig
+
+
+def hamming(sig_a: int, sig_b: int) -> int:
+    """Дистанция Хэмминга между двумя 64-битными сигнатурами."""
+    return (sig_a ^ sig_b).bit_count()
@@ -1,9 +1,50 @@
+import bisect
 import json
+import os
+import time
 from datetime import datetime, timedelta, timezone
 from typing import List, Dict
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 
 from paths import DATA_DIR
 
+# orjson (опционально): быстрее стандартного json; без него работает stdlib
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Трекинговые query-параметры, не влияющие на содержимое статьи
+_TRACKING_PARAMS = {
+    'utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content',
+    'fbclid', 'gclid',
+}
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Приводит URL к каноничной форме для дедупликации: scheme и host в нижний
+    регистр, без трейлинг-слэша и без трекинговых параметров (utm_*, fbclid
+    и т.п.). Один и тот же материал из RSS нередко приходит с разными
+    utm-метками — без нормализации такие дубли проскакивают в дорогую
+    текстовую проверку дальше по конвейеру.
+    """
+    try:
+        parts = urlsplit(url.strip())
+        kept = [
+            (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+            if k.lower() not in _TRACKING_PARAMS and not k.lower().startswith('utm_')
+        ]
+        return urlunsplit((
+            parts.scheme.lower(),
+            parts.netloc.lower(),
+            parts.path.rstrip('/'),
+            urlencode(kept),
+            '',
+        ))
+    except ValueError:
+        return url
+
 
 class URLTracker:
     """
@@ -19,23 +60,63 @@ class URLTracker:
             storage_file: Путь к JSON файлу для хранения URL (относительно DATA_DIR)
         """
         self.storage_path = DATA_DIR / storage_file
-        
+        # Кэш распарсенного списка: каждая проверка/вставка раньше заново
+        # читала и декодировала весь JSON с диска. Валидность кэша
+        # подтверждается по mtime файла — если файл перезаписал другой
+        # процесс, список перечитывается
+        self._urls: List[Dict[str, str]] | None = None
+        self._urls_mtime: int | None = None
+        # Set каноничных URL для O(1)-проверок; строится лениво и
+        # поддерживается инкрементально при вставках
+        self._canonical: set | None = None
+
         # Создаём файл если не существует
         if not self.storage_path.exists():
             self._save_urls([])
-    
-    def _load_urls(self) -> List[Dict[str, str]]:
-        """Загружает URL из файла"""
+
+    def _file_mtime(self) -> int | None:
+        """st_mtime_ns файла хранилища (None, если файла нет)"""
         try:
-            with open(self.storage_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return []
-    
+            return os.stat(self.storage_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _load_urls(self) -> List[Dict[str, str]]:
+        """Загружает URL (с диска — только если кэш пуст или файл изменился)"""
+        mtime = self._file_mtime()
+        if self._urls is None or mtime != self._urls_mtime:
+            try:
+                if orjson is not None:
+                    self._urls = orjson.loads(self.storage_path.read_bytes())
+                else:
+                    with open(self.storage_path, 'r', encoding='utf-8') as f:
+                        self._urls = json.load(f)
+            except (FileNotFoundError, ValueError):
+                # orjson.JSONDecodeError — подкласс ValueError, как и у stdlib
+                self._urls = []
+            self._urls_mtime = mtime
+            self._canonical = None  # список перечитан — set устарел
+        return self._urls
+
     def _save_urls(self, urls: List[Dict[str, str]]) -> None:
-        """Сохраняет URL в файл"""
-        with open(self.storage_path, 'w', encoding='utf-8') as f:
-            json.dump(urls, f, ensure_ascii=False, indent=2)
+        """Сохраняет URL в файл (и обновляет кэш)"""
+        self._urls = urls
+        self._canonical = None  # пересоберётся лениво при следующей проверке
+        if orjson is not None:
+            self.storage_path.write_bytes(orjson.dumps(urls, option=orjson.OPT_INDENT_2))
+        else:
+            with open(self.storage_path, 'w', encoding='utf-8') as f:
+                json.dump(urls, f, ensure_ascii=False, indent=2)
+        self._urls_mtime = self._file_mtime()
+
+    def _canonical_set(self) -> set:
+        """Set каноничных URL всех записей (кэшируется на инстансе)"""
+        # _load_urls первым: при изменении файла он сбрасывает _canonical
+        urls = self._load_urls()
+        if self._canonical is None:
+            # Старые записи могли сохраниться в сыром виде — канонизируем при загрузке
+            self._canonical = {canonicalize_url(entry['url']) for entry in urls}
+        return self._canonical
     
     def cleanup_old_urls(self, max_age_hours: int = 24) -> int:
         """
@@ -49,21 +130,35 @@ class URLTracker:
         """
         urls = self._load_urls()
         now = datetime.now(timezone.utc)
-        
+        cutoff_ts = time.time() - max_age_hours * 3600
+
         # Фильтруем только те URL, которые моложе max_age_hours
         old_count = len(urls)
-        fresh_urls = []
-        
-        for url_entry in urls:
-            try:
-                added_at = datetime.fromisoformat(url_entry['added_at'])
-                age = now - added_at
-                
-                if age < timedelta(hours=max_age_hours):
-                    fresh_urls.append(url_entry)
-            except (KeyError, ValueError):
-                # Пропускаем некорректные записи
-                continue
+
+        # Записи хронологические — очистка сводится к отсечению префикса
+        # бинарным поиском, когда у всех записей есть epoch-метка
+        if urls and all('added_at_ts' in e for e in urls):
+            idx = bisect.bisect_left(urls, cutoff_ts, key=lambda e: e['added_at_ts'])
+            fresh_urls = urls[idx:]
+        else:
+            fresh_urls = []
+            for url_entry in urls:
+                # Быстрый путь: epoch-метка новых записей сравнивается как
+                # число, без разбора ISO-строки
+                ts = url_entry.get('added_at_ts')
+                if ts is not None:
+                    if ts >= cutoff_ts:
+                        fresh_urls.append(url_entry)
+                    continue
+                try:
+                    added_at = datetime.fromisoformat(url_entry['added_at'])
+                    age = now - added_at
+
+                    if age < timedelta(hours=max_age_hours):
+                        fresh_urls.append(url_entry)
+                except (KeyError, ValueError):
+                    # Пропускаем некорректные записи
+                    continue
         
         # Сохраняем только свежие URL
         self._save_urls(fresh_urls)
@@ -81,10 +176,8 @@ class URLTracker:
         Returns:
             True если URL уже существует, False если новый
         """
-        urls = self._load_urls()
-        existing_urls = {entry['url'] for entry in urls}
-        return url in existing_urls
-    
+        return canonicalize_url(url) in self._canonical_set()
+
     def add_url(self, url: str) -> bool:
         """
         Добавляет URL в базу с текущей датой
@@ -100,11 +193,12 @@ class URLTracker:
         
         urls = self._load_urls()
         urls.append({
-            'url': url,
-            'added_at': datetime.now(timezone.utc).isoformat()
+            'url': canonicalize_url(url),
+            'added_at': datetime.now(timezone.utc).isoformat(),
+            'added_at_ts': int(time.time()),
         })
         self._save_urls(urls)
-        
+
         return True
     
     def add_urls_batch(self, url_list: List[str]) -> int:
@@ -118,21 +212,26 @@ class URLTracker:
             Количество успешно добавленных URL
         """
         urls = self._load_urls()
-        existing_urls = {entry['url'] for entry in urls}
-        
+        existing_urls = self._canonical_set()
+
         added_count = 0
         now = datetime.now(timezone.utc).isoformat()
-        
+        now_ts = int(time.time())
+
         for url in url_list:
+            url = canonicalize_url(url)
             if url not in existing_urls:
                 urls.append({
                     'url': url,
-                    'added_at': now
+                    'added_at': now,
+                    'added_at_ts': now_ts,
                 })
                 existing_urls.add(url)  # Обновляем set для следующих проверок
                 added_count += 1
-        
+
+        # _save_urls сбрасывает кэш set-а — сохраняем пополненный и возвращаем на место
         self._save_urls(urls)
+        self._canonical = existing_urls
         return added_count
     
     def get_stats(self) -> Dict[str, int]:
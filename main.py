@@ -1,4 +1,5 @@
 import asyncio
+import importlib.util
 import subprocess
 import sys
 from pathlib import Path
@@ -32,6 +33,14 @@ from bot.bot_posting import send_news_to_admin, button_handler, start, schedule_
 BOT_TOKEN = os.getenv("TELEGRAM_TOKEN")
 PROXY_URL = os.getenv("PROXY_URL")  # Опционально для прокси
 
+# Webhook-режим (опционально): Telegram пушит апдейты сам, без пауз
+# long-polling — callback'и приходят быстрее, особенно при серии кликов.
+# Включается, только если задан WEBHOOK_URL (публичный HTTPS-адрес,
+# TLS терминируется прокси/хостингом). Без него — прежний run_polling.
+WEBHOOK_URL = os.getenv("WEBHOOK_URL")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8443"))
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET")
+
 # Глобальная переменная для приложения
 bot_app = None
 
@@ -124,8 +133,19 @@ async def post_init(application: Application):
     await application.bot.set_my_commands(commands)
     print("✅ Меню команд установлено")
 
-    # Создаём и запускаем планировщик (явный часовой пояс, не полагаемся на tzlocal)
-    scheduler = AsyncIOScheduler(timezone=LOCAL_TZ)
+    # Создаём и запускаем планировщик (явный часовой пояс, не полагаемся на tzlocal).
+    # coalesce: пропущенные запуски одного job'а схлопываются в один (после
+    # долгого фриза не будет очереди из повторных пайплайнов);
+    # max_instances=1: пайплайн не запускается поверх ещё работающего;
+    # misfire_grace_time: опоздавший тик всё же выполняется в пределах минуты.
+    scheduler = AsyncIOScheduler(
+        timezone=LOCAL_TZ,
+        job_defaults={
+            "coalesce": True,
+            "max_instances": 1,
+            "misfire_grace_time": 60,
+        },
+    )
 
     # Сбор + обработка новостей: каждые 2 часа (копит буфер дайджеста)
     scheduler.add_job(
@@ -174,6 +194,16 @@ def main():
     sys.stdout.reconfigure(line_buffering=True)
     sys.stderr.reconfigure(line_buffering=True)
 
+    # uvloop (libuv, C) — drop-in замена стандартного event loop, заметно
+    # снижает накладные расходы на каждый await/callback. Опционален:
+    # без пакета (или на Windows) работаем на stdlib asyncio как раньше.
+    try:
+        import uvloop
+        uvloop.install()
+        print("⚡ uvloop активирован", flush=True)
+    except ImportError:
+        pass
+
     # Отметка версии сборки — сразу видно, какой коммит реально запущен
     commit = os.getenv("RAILWAY_GIT_COMMIT_SHA") or os.getenv("GIT_COMMIT") or "unknown"
     print(f"🏷  Версия сборки (commit): {commit[:7]}", flush=True)
@@ -184,30 +214,38 @@ def main():
     # Проверяем соединение с интернетом
     print("🔍 Проверка подключения к Telegram API...", flush=True)
 
+    def build_request(pool_size):
+        """
+        HTTPXRequest с HTTP/2 (мультиплексирование: всплеск постов идёт по
+        одному TLS-соединению без новых handshake'ов). Если httpx поставлен
+        без extra 'http2' (нет пакета h2) — откатываемся на HTTP/1.1.
+        """
+        kwargs = dict(
+            connect_timeout=30.0,
+            read_timeout=30.0,
+            pool_timeout=30.0,
+            connection_pool_size=pool_size,
+        )
+        if PROXY_URL:
+            kwargs["proxy"] = PROXY_URL
+        # Наличие h2 проверяем заранее: PTB оборачивает ImportError от httpx
+        # в RuntimeError, так что ловить исключение здесь бесполезно
+        if importlib.util.find_spec("h2") is not None:
+            return HTTPXRequest(http_version="2", **kwargs)
+        print("ℹ️  Пакет h2 не установлен, используем HTTP/1.1", flush=True)
+        return HTTPXRequest(**kwargs)
+
     try:
         # Создаём приложение с обработчиками
         builder = Application.builder().token(BOT_TOKEN)
 
-        # Если указан прокси, используем его
         if PROXY_URL:
             print(f"🔐 Используется прокси: {PROXY_URL}", flush=True)
-            request = HTTPXRequest(
-                proxy=PROXY_URL,
-                connect_timeout=30.0,
-                read_timeout=30.0,
-                pool_timeout=30.0,
-                connection_pool_size=8
-            )
-            builder = builder.request(request)
-        else:
-            # Увеличиваем таймауты и настраиваем пул соединений
-            request = HTTPXRequest(
-                connect_timeout=30.0,
-                read_timeout=30.0,
-                pool_timeout=30.0,
-                connection_pool_size=8
-            )
-            builder = builder.request(request)
+
+        # Отдельные пулы: большой для отправки сообщений, маленький для
+        # long-polling getUpdates (PTB требует независимый request-объект)
+        builder = builder.request(build_request(pool_size=64))
+        builder = builder.get_updates_request(build_request(pool_size=2))
 
         app = builder.post_init(post_init).post_shutdown(post_shutdown).build()
 
@@ -225,10 +263,21 @@ def main():
         print("🛑 Нажмите Ctrl+C для остановки\\n", flush=True)
 
         # Запускаем бота (retry-логика настроена через HTTPXRequest выше)
-        app.run_polling(
-            allowed_updates=["message", "callback_query"],
-            drop_pending_updates=True
-        )
+        if WEBHOOK_URL:
+            print(f"🌐 Режим webhook: {WEBHOOK_URL} (порт {WEBHOOK_PORT})", flush=True)
+            app.run_webhook(
+                listen="0.0.0.0",
+                port=WEBHOOK_PORT,
+                webhook_url=WEBHOOK_URL,
+                secret_token=WEBHOOK_SECRET,
+                allowed_updates=["message", "callback_query"],
+                drop_pending_updates=True
+            )
+        else:
+            app.run_polling(
+                allowed_updates=["message", "callback_query"],
+                drop_pending_updates=True
+            )
 
     except KeyboardInterrupt:
         print("\n🛑 Бот остановлен пользователем")